@@ -4,11 +4,14 @@ from fastapi import APIRouter, HTTPException, Response
 from passlib.context import CryptContext
 from sqlalchemy.exc import IntegrityError, NoResultFound
 
-from app.api.dependencies import UserIdDep, DBDep
+from app.api.dependencies import UserIdDep, DBDep, ReadDBDep
 from app.schemas.users import UserRequestAdd, UserAdd
 from app.services.auth import AuthService
+from app.services.tokens import jwks
 
 router = APIRouter(prefix="/auth")
+# Стандартный адрес JWKS, по которому другие сервисы забирают открытые ключи.
+well_known_router = APIRouter(prefix="/.well-known")
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
@@ -28,8 +31,8 @@ async def register_user(
     Returns:
         Словарь со статусом результата операции.
     """
-    # Хэшируем пароль перед сохранением, чтобы не хранить его в открытом виде.
-    hashed_password = AuthService().hash_password(data.password)
+    # Хэшируем пароль в пуле потоков, чтобы не хранить его в открытом виде и не блокировать event loop.
+    hashed_password = await AuthService().hash_password_async(data.password)
     # Формируем данные пользователя, которые будут сохранены в базе.
     new_user_data = UserAdd(email=data.email, hashed_password=hashed_password)
     await db.users.add(new_user_data)
@@ -61,8 +64,8 @@ async def login_user(
     except NoResultFound:
         raise HTTPException(status_code=401, detail="Пользователь с таким email не зарегистрирован")
     
-    # Сверяем введенный пароль с сохраненным хэшем.
-    if not AuthService().verify_password(data.password, user.hashed_password):
+    # Сверяем введенный пароль с сохраненным хэшем (в пуле потоков, вне event loop).
+    if not await AuthService().verify_password_async(data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Пароль неверный")
     
     # Формируем токен доступа , сохраняем токен в cookie для последующих запросов.
@@ -75,7 +78,7 @@ async def login_user(
 @router.get("/me")
 async def get_me(
     user_id: UserIdDep,
-    db: DBDep
+    db: ReadDBDep
 ):
     """
     Возвращает пользователя по идентификатору из зависимости авторизации.
@@ -106,3 +109,19 @@ async def logout_user(response: Response):
     # Удаляем access-токен из cookies, чтобы клиент больше не отправлял его.
     response.delete_cookie("access_token")
     return {"Logout OK"}
+
+
+@well_known_router.get("/jwks.json")
+async def get_jwks(response: Response):
+    """
+    Возвращает открытые ключи проверки токенов в формате JWKS.
+
+    Args:
+        response: объект ответа для установки заголовков кэширования.
+
+    Returns:
+        Словарь JWKS (для HS-алгоритмов — пустой список ключей).
+    """
+    # JWKS собран при старте и отдается из памяти; клиентам разрешаем кэшировать его.
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return jwks
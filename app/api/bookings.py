@@ -1,20 +1,118 @@
-from fastapi import APIRouter, HTTPException
+import csv
+import hashlib
+import io
+from datetime import timedelta
+from typing import AsyncIterator, Literal
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.exc import NoResultFound
 
-from app.api.dependencies import DBDep, UserIdDep
-from app.schemas.bookings import BookingAddRequest, BookingAdd
+from app.api.dependencies import DBDep, ReadDBDep, UserIdDep, check_dates, stick_to_primary
+from app.config import settings
+from app.database import async_session_maker
+from app.exceptions import AllRoomsAreBookedException
+from app.schemas.bookings import Booking, BookingAddRequest, BookingAdd
+from app.utils.db_manager import DBManager
+from app.utils.responses import PydanticJSONResponse
 
 router = APIRouter(prefix="/bookings")
 
+IDEMPOTENCY_KEY_TTL = timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
 
-@router.get("")
+@router.get("", response_model=list[Booking])
 async def get_bookings(db: DBDep):
-    return await db.bookings.get_all()
+    return PydanticJSONResponse(await db.bookings.get_all(), list[Booking])
+
+
+async def bookings_as_ndjson() -> AsyncIterator[str]:
+    """
+    Построчно сериализует все бронирования в NDJSON.
+
+    Returns:
+        Асинхронный итератор кусков ответа (одна пачка строк за раз).
+    """
+    # Сессия открывается внутри генератора: она должна жить, пока отдается ответ,
+    # а не до выхода из обработчика.
+    async with DBManager(session_factory=async_session_maker) as db:
+        async for bookings in db.bookings.stream_filtered():
+            yield "".join(booking.model_dump_json() + "\n" for booking in bookings)
+
+
+async def bookings_as_csv() -> AsyncIterator[str]:
+    """
+    Построчно сериализует все бронирования в CSV с заголовком.
+
+    Returns:
+        Асинхронный итератор кусков ответа (одна пачка строк за раз).
+    """
+    fieldnames = list(Booking.model_fields)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    yield buffer.getvalue()
+    async with DBManager(session_factory=async_session_maker) as db:
+        async for bookings in db.bookings.stream_filtered():
+            # Переиспользуем буфер: в памяти только текущая пачка.
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(booking.model_dump() for booking in bookings)
+            yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_bookings(
+        format: Literal["ndjson", "csv"] = Query(default="ndjson", description="Формат выгрузки"),
+):
+    """
+    Выгружает все бронирования потоком, не загружая таблицу в память.
+
+    Args:
+        format: формат выгрузки — ndjson или csv.
+
+    Returns:
+        Потоковый ответ с бронированиями.
+    """
+    if format == "csv":
+        return StreamingResponse(
+            bookings_as_csv(),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="bookings.csv"'},
+        )
+    return StreamingResponse(bookings_as_ndjson(), media_type="application/x-ndjson")
+
 
+@router.get("/me", response_model=list[Booking])
+async def get_my_bookings(user_id: UserIdDep, db: ReadDBDep):
+    return PydanticJSONResponse(await db.bookings.get_filtered(user_id=user_id), list[Booking])
 
-@router.get("/me")
-async def get_my_bookings(user_id: UserIdDep, db: DBDep):
-    return await db.bookings.get_filtered(user_id=user_id)
+
+async def get_stored_response(db: DBManager, user_id: int, key: str, request_hash: str) -> dict | None:
+    """
+    Ищет ответ, сохраненный для ключа идемпотентности пользователя.
+
+    Args:
+        db: Менеджер БД для доступа к репозиториям.
+        user_id: идентификатор пользователя.
+        key: значение заголовка Idempotency-Key.
+        request_hash: хэш тела текущего запроса.
+
+    Returns:
+        Сохраненный ответ или None, если ключ еще не использовался или истек.
+
+    Raises:
+        HTTPException: 422, если ключ уже использован с другими данными.
+    """
+    # Ключ без ответа снаружи не виден: его занимают и сохраняют ответ в одной транзакции,
+    # а параллельный запрос ждет ее на уникальном индексе (см. reserve).
+    stored = await db.idempotency_keys.get_key(user_id=user_id, key=key, ttl=IDEMPOTENCY_KEY_TTL)
+    if stored is None:
+        return None
+    if stored.request_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key уже использован с другими данными запроса")
+    return stored.response
 
 
 @router.post("")
@@ -22,21 +120,55 @@ async def add_booking(
         user_id: UserIdDep,
         db: DBDep,
         booking_data: BookingAddRequest,
+        response: Response,
+        idempotency_key: str | None = Header(
+            default=None,
+            max_length=255,
+            description="Ключ идемпотентности: повтор запроса с тем же ключом вернет исходный ответ",
+        ),
 ):
     """
     Создает бронирование для пользователя.
 
+    Если передан заголовок Idempotency-Key, успешный ответ сохраняется, и повтор запроса
+    с тем же ключом возвращает его без повторной проверки мест и вставки.
+
     Args:
         user_id: идентификатор пользователя из зависимости авторизации.
         db: Менеджер БД для доступа к репозиториям.
         booking_data: данные бронирования из запроса.
+        response: объект ответа (заголовок Idempotent-Replayed, cookie чтения из основной БД).
+        idempotency_key: значение заголовка Idempotency-Key.
 
     Returns:
         Статус операции и созданное бронирование.
+
+    Raises:
+        HTTPException: 404, если номер не найден; 409, если свободных мест на период нет;
+            422, если Idempotency-Key уже использован с другими данными.
     """
-    # Получаем номер по id; если не найден — возвращаем ошибку.
+    # Проверяем, что выезд позже заезда.
+    check_dates(booking_data.date_from, booking_data.date_to)
+
+    # Повтор по Idempotency-Key: один поиск по первичному ключу и готовый ответ.
+    if idempotency_key is not None:
+        request_hash = hashlib.sha256(booking_data.model_dump_json().encode()).hexdigest()
+        stored = await get_stored_response(db, user_id, idempotency_key, request_hash)
+        # Ключ не найден — занимаем его. Если параллельный запрос с тем же ключом
+        # успел его занять и зафиксировать, после ожидания берем его ответ.
+        if stored is None and not await db.idempotency_keys.reserve(
+                user_id, idempotency_key, request_hash, ttl=IDEMPOTENCY_KEY_TTL,
+        ):
+            stored = await get_stored_response(db, user_id, idempotency_key, request_hash)
+        if stored is not None:
+            response.headers["Idempotent-Replayed"] = "true"
+            stick_to_primary(response)
+            return stored
+
+    # Получаем номер по id и блокируем его строку до коммита, чтобы параллельные
+    # бронирования этого же номера проверяли остаток по очереди; если не найден — ошибка.
     try:
-        room = await db.rooms.get_room(id=booking_data.room_id)
+        room = await db.rooms.get_room(for_update=True, id=booking_data.room_id)
     except NoResultFound:
         raise HTTPException(status_code=404, detail="Номер не найден")
     # Берем цену номера для расчета стоимости бронирования.
@@ -46,7 +178,21 @@ async def add_booking(
         price=room_price,
         **booking_data.model_dump(),
     )
-    # Создаем бронирование и фиксируем изменения.
-    booking = await db.bookings.add(_booking_data)
+    # Создаем бронирование с проверкой остатка и сразу фиксируем, освобождая блокировку.
+    # При ошибке транзакция откатывается вместе с занятым ключом — повтор выполнится заново.
+    try:
+        booking = await db.bookings.add_booking(_booking_data)
+    except AllRoomsAreBookedException as ex:
+        raise HTTPException(status_code=409, detail=ex.detail)
+    result = {"status": "OK", "data": booking}
+    # Подтверждение и аналитика — в фоне: ответ уходит сразу после COMMIT,
+    # а задачи ставятся в той же транзакции и не выполнятся, если она откатится.
+    await db.enqueue_job("send_booking_confirmation", {"booking_id": booking.id})
+    await db.enqueue_job("track_booking_created", booking.model_dump(mode="json"))
+    # Ответ сохраняется в той же транзакции, что и бронирование.
+    if idempotency_key is not None:
+        await db.idempotency_keys.save_response(user_id, idempotency_key, jsonable_encoder(result))
     await db.commit()
-    return {"status": "OK", "data": booking}
+    # Следующие чтения клиента — из основной БД, пока реплики не догонят запись.
+    stick_to_primary(response)
+    return result
@@ -1,11 +1,14 @@
 # app/api/dependencies.py
 
-from fastapi import Depends, HTTPException, Query, Request
+import time
+from datetime import date
+from fastapi import Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field
 from typing import Annotated
 
-from app.database import async_session_maker
-from app.services.auth import AuthService
+from app.config import settings
+from app.database import async_session_maker, read_router
+from app.services.tokens import token_verifier
 from app.utils.db_manager import DBManager
 
 
@@ -15,11 +18,17 @@ class PaginationParams(BaseModel):
     """Параметры пагинации."""
     page: Annotated[int, Field(default=1, ge=1, description="Номер страницы")]
     per_page: Annotated[int, Field(default=5, ge=1, le=10, description="Количество элементов на странице")]
+    cursor: Annotated[int | None, Field(default=None, ge=0, description="id последнего элемента предыдущей страницы")]
 
 
 def pagination_params(
     page: int = Query(default=1, ge=1, description="Номер страницы"),
     per_page: int = Query(default=3, ge=1, le=10, description="Количество элементов на странице"),
+    cursor: int | None = Query(
+        default=None,
+        ge=0,
+        description="id последнего элемента предыдущей страницы (keyset-пагинация, page игнорируется)",
+    ),
 ) -> PaginationParams:
     """
     Создает параметры пагинации из query-параметров.
@@ -27,18 +36,46 @@ def pagination_params(
     Args:
         page: Номер страницы.
         per_page: Количество элементов на странице.
+        cursor: id последнего элемента предыдущей страницы.
 
     Returns:
         Параметры пагинации.
     """
     # Собираем параметры пагинации в модель, чтобы использовать единый тип в обработчиках.
-    return PaginationParams(page=page, per_page=per_page)
+    return PaginationParams(page=page, per_page=per_page, cursor=cursor)
 
 
 # Pagination Dependency Parameter
 PaginationDep = Annotated[PaginationParams, Depends(pagination_params)]  
 
 
+# ================= Проверяем период бронирования =============================
+
+def check_dates(date_from: date | None, date_to: date | None) -> bool:
+    """
+    Проверяет пару дат из query-параметров.
+
+    Args:
+        date_from: Дата заезда.
+        date_to: Дата выезда.
+
+    Returns:
+        True, если период задан; False, если обе даты не переданы.
+
+    Raises:
+        HTTPException: если передана только одна дата или выезд не позже заезда.
+    """
+    # Без дат фильтр по периоду не применяется.
+    if date_from is None and date_to is None:
+        return False
+    # Период задается только парой дат, и выезд должен быть позже заезда.
+    if date_from is None or date_to is None:
+        raise HTTPException(status_code=400, detail="Нужно указать обе даты: date_from и date_to")
+    if date_from >= date_to:
+        raise HTTPException(status_code=400, detail="Дата выезда должна быть позже даты заезда")
+    return True
+
+
 # ================= Получаем User ID из JWT-токена ============================
 
 def get_token(request: Request) -> str:
@@ -61,7 +98,7 @@ def get_token(request: Request) -> str:
     return token
 
 
-def get_current_user_id(token: str = Depends(get_token)) -> int:
+async def get_current_user_id(token: str = Depends(get_token)) -> int:
     """
     Возвращает идентификатор пользователя из access-токена.
 
@@ -71,8 +108,10 @@ def get_current_user_id(token: str = Depends(get_token)) -> int:
     Returns:
         Идентификатор пользователя (user_id) из payload токена.
     """
-    # Декодируем токен и извлекаем user_id из payload.
-    data = AuthService().decode_token(token)
+    # Проверяем токен общим верификатором (ключ подготовлен заранее, claims кэшируются)
+    # и извлекаем user_id из payload. Зависимость асинхронная: FastAPI вызывает ее в event loop,
+    # а не в пуле потоков, поэтому общий кэш claims не меняется из нескольких потоков сразу.
+    data = token_verifier.decode(token)
     return data["user_id"]
 
 
@@ -86,4 +125,45 @@ async def get_db():
         yield db
 
 
-DBDep = Annotated[DBManager, Depends(get_db)]
\ No newline at end of file
+DBDep = Annotated[DBManager, Depends(get_db)]
+
+
+# ================= Сессия БД для чтения (реплики) ============================
+
+# Cookie с моментом (unix time), до которого чтения клиента идут в основную БД.
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+def stick_to_primary(response: Response) -> None:
+    """
+    Направляет чтения клиента в основную БД на DB_REPLICA_STICKY_SECONDS после записи.
+
+    Реплика отстает от основной БД, и без этого клиент мог бы не увидеть только что
+    созданное бронирование (read-your-writes).
+
+    Args:
+        response: объект ответа для установки cookie.
+    """
+    # Без реплик все и так читается из основной БД.
+    if not read_router.session_makers:
+        return
+    until = int(time.time()) + settings.DB_REPLICA_STICKY_SECONDS
+    response.set_cookie(READ_PRIMARY_COOKIE, str(until), max_age=settings.DB_REPLICA_STICKY_SECONDS, httponly=True)
+
+
+async def get_read_db(request: Request):
+    """
+    Выдает DBManager для чтения: сессию реплики или основной БД (см. stick_to_primary).
+
+    Args:
+        request: HTTP-запрос (из него читается cookie READ_PRIMARY_COOKIE).
+    """
+    # Только что писавший клиент читает из основной БД, остальные — из реплик по кругу.
+    sticky_until = request.cookies.get(READ_PRIMARY_COOKIE, "")
+    prefer_primary = sticky_until.isdigit() and int(sticky_until) > time.time()
+    session_factory = read_router.session_maker(prefer_primary=prefer_primary)
+    async with DBManager(session_factory=session_factory) as db:
+        yield db
+
+
+ReadDBDep = Annotated[DBManager, Depends(get_read_db)]
\ No newline at end of file
@@ -1,62 +1,118 @@
 # app/api/hotels.py
 
-from fastapi import Query, Body, APIRouter
+from datetime import date
+from typing import Literal
 
-from app.api.dependencies import PaginationDep, DBDep
-from app.schemas.hotels import HotelAdd, HotelPatch
+from fastapi import Query, Body, APIRouter, HTTPException, Response
+
+from app.api.dependencies import PaginationDep, DBDep, ReadDBDep, check_dates, stick_to_primary
+from app.schemas.hotels import Hotel, HotelAdd, HotelPatch, HotelWithRooms, HotelWithRoomsAvailability
+from app.utils.responses import PydanticJSONResponse
 from app.api.examples import hotelsPOSTexample
 
 
 router = APIRouter(prefix="/hotels")
 
+# Что можно подгрузить вместе с отелем через параметр include
+IncludeParam = Literal["rooms", "rooms.availability"]
+INCLUDE_DESCRIPTION = "rooms — номера отеля, rooms.availability — номера с остатком мест на date_from..date_to"
+
 
-@router.get("")
+@router.get("", response_model=list[Hotel] | list[HotelWithRooms] | list[HotelWithRoomsAvailability])
 async def get_hotels(
     pagination: PaginationDep,
-    db: DBDep,
+    db: ReadDBDep,
     sub_title: str | None = Query(default=None, description="Подстрока названия отеля в любом регистре"),
-    sub_location: str | None = Query(default=None, description="Подстрока адреса отеля в любом регистре")
+    sub_location: str | None = Query(default=None, description="Подстрока адреса отеля в любом регистре"),
+    date_from: date | None = Query(default=None, description="Дата заезда"),
+    date_to: date | None = Query(default=None, description="Дата выезда"),
+    ranked: bool = Query(default=False, description="Сортировать по похожести на sub_title/sub_location"),
+    include: IncludeParam | None = Query(default=None, description=INCLUDE_DESCRIPTION),
 ):
     """
     Возвращает список отелей.
 
+    Если переданы даты, возвращаются только отели, где есть свободный номер на период.
+    Если передан cursor, страница строится по id (следующий cursor — id последнего отеля в ответе).
+
     Args:
         pagination: Параметры пагинации.
         db: Менеджер БД для доступа к репозиториям.
         sub_title: Подстрока названия отеля в любом регистре.
         sub_location: Подстрока адреса отеля в любом регистре.
+        date_from: Дата заезда.
+        date_to: Дата выезда.
+        ranked: Сортировать по похожести на строки поиска.
+        include: Что загрузить вместе с отелями.
 
     Returns:
         Список отелей.
     """
-    # Читаем список отелей с учетом фильтров и пагинации.
-    return await db.hotels.get_all(
+    # Проверяем, что период задан корректно (или не задан вовсе).
+    has_dates = check_dates(date_from, date_to)
+    # Остаток мест считается на период, поэтому без дат он не имеет смысла.
+    if include == "rooms.availability" and not has_dates:
+        raise HTTPException(status_code=400, detail="Для include=rooms.availability нужны date_from и date_to")
+    # Ранжированная выдача упорядочена не по id, поэтому курсор к ней неприменим.
+    if ranked and pagination.cursor is not None:
+        raise HTTPException(status_code=400, detail="Параметр cursor несовместим с ranked=true")
+    # Читаем список отелей с учетом фильтров и пагинации (и номерами, если их запросили).
+    hotels = await db.hotels.get_all(
         location=sub_location,
         title=sub_title,
         limit=pagination.per_page,
-        offset=pagination.per_page * (pagination.page - 1)
+        offset=pagination.per_page * (pagination.page - 1),
+        date_from=date_from,
+        date_to=date_to,
+        after_id=pagination.cursor,
+        rank_by_similarity=ranked,
+        with_rooms=include is not None,
     )
+    # Модели из репозитория сериализуем сразу в байты, без повторной проверки FastAPI.
+    if include == "rooms.availability":
+        hotels = await db.hotels.add_rooms_availability(hotels, date_from=date_from, date_to=date_to)
+        return PydanticJSONResponse(hotels, list[HotelWithRoomsAvailability])
+    return PydanticJSONResponse(hotels, list[HotelWithRooms] if include == "rooms" else list[Hotel])
 
 
 @router.get("/{hotel_id}")
-async def get_hotel(hotel_id: int, db: DBDep):
+async def get_hotel(
+    hotel_id: int,
+    db: ReadDBDep,
+    include: IncludeParam | None = Query(default=None, description=INCLUDE_DESCRIPTION),
+    date_from: date | None = Query(default=None, description="Дата заезда (для include=rooms.availability)"),
+    date_to: date | None = Query(default=None, description="Дата выезда (для include=rooms.availability)"),
+):
     """
     Возвращает один отель по его id.
 
     Args:
         hotel_id: идентификатор отеля в БД.
         db: Менеджер БД для доступа к репозиториям.
+        include: Что загрузить вместе с отелем.
+        date_from: Дата заезда.
+        date_to: Дата выезда.
 
     Returns:
         JSON с параметрами одного отеля.
     """
-    # Ищем отель по идентификатору.
-    return await db.hotels.get_one_or_none(id=hotel_id)
+    has_dates = check_dates(date_from, date_to)
+    # Без include ищем отель по идентификатору (ответ может прийти из кэша).
+    if include is None:
+        return await db.hotels.get_one_or_none(id=hotel_id)
+    if include == "rooms.availability" and not has_dates:
+        raise HTTPException(status_code=400, detail="Для include=rooms.availability нужны date_from и date_to")
+    # Отель и его номера — два запроса вместо отдельных вызовов API на каждый номер.
+    hotel = await db.hotels.get_one_with_rooms(id=hotel_id)
+    if hotel is None or include == "rooms":
+        return hotel
+    return (await db.hotels.add_rooms_availability([hotel], date_from=date_from, date_to=date_to))[0]
 
 
 @router.post("")
 async def create_hotel(
     db: DBDep,
+    response: Response,
     hotel_data: HotelAdd = Body(openapi_examples=hotelsPOSTexample),
 ):
     """
@@ -64,6 +120,7 @@ async def create_hotel(
 
     Args:
         db: Менеджер БД для доступа к репозиториям.
+        response: Объект ответа (cookie чтения из основной БД).
         hotel_data: Данные отеля из запроса.
 
     Returns:
@@ -72,15 +129,44 @@ async def create_hotel(
     # Создаем новый отель и сохраняем его в базе.
     hotel = await db.hotels.add(hotel_data)
     await db.commit()
+    # Следующие чтения клиента идут в основную БД, пока реплики догоняют запись.
+    stick_to_primary(response)
 
     return {"status": "OK", "data": hotel}
 
 
+@router.post("/bulk")
+async def create_hotels_bulk(
+    db: DBDep,
+    response: Response,
+    hotels_data: list[HotelAdd] = Body(),
+):
+    """
+    Создает много отелей одним запросом к БД.
+
+    Args:
+        db: Менеджер БД для доступа к репозиториям.
+        response: Объект ответа (cookie чтения из основной БД).
+        hotels_data: Список данных отелей.
+
+    Returns:
+        Статус операции и id созданных отелей в порядке входного списка.
+    """
+    # Вставляем все отели многострочным INSERT и фиксируем одной транзакцией.
+    hotels_ids = await db.hotels.add_bulk(hotels_data)
+    await db.commit()
+    # Следующие чтения клиента идут в основную БД, пока реплики догоняют запись.
+    stick_to_primary(response)
+
+    return {"status": "OK", "data": hotels_ids}
+
+
 @router.put("/{hotel_id}")
 async def edit_hotel(
     hotel_id: int, 
     hotel_data: HotelAdd,
-    db: DBDep
+    db: DBDep,
+    response: Response,
 ):
     """
     Меняет все параметры одного отеля.
@@ -89,6 +175,7 @@ async def edit_hotel(
         hotel_id: Идентификатор отеля.
         hotel_data: Новые данные отеля.
         db: Менеджер БД для доступа к репозиториям.
+        response: Объект ответа (cookie чтения из основной БД).
 
     Returns:
         Статус операции.
@@ -96,6 +183,8 @@ async def edit_hotel(
     # Полностью обновляем данные отеля по идентификатору.
     hotel = await db.hotels.edit(hotel_data, id=hotel_id)
     await db.commit()
+    # Следующие чтения клиента идут в основную БД, пока реплики догоняют запись.
+    stick_to_primary(response)
     return {"status": "OK"}
 
 
@@ -108,6 +197,7 @@ async def partially_edit_hotel(
     hotel_id: int, 
     hotel_data: HotelPatch,
     db: DBDep,
+    response: Response,
 ):
     """
     Меняет один из параметров или оба параметра одного отеля.
@@ -116,6 +206,7 @@ async def partially_edit_hotel(
         hotel_id: Идентификатор отеля.
         hotel_data: Частичные данные отеля.
         db: Менеджер БД для доступа к репозиториям.
+        response: Объект ответа (cookie чтения из основной БД).
 
     Returns:
         Статус операции.
@@ -123,17 +214,20 @@ async def partially_edit_hotel(
     # Обновляем только переданные поля отеля.
     await db.hotels.edit(hotel_data, exclude_unset=True, id=hotel_id)
     await db.commit()
+    # Следующие чтения клиента идут в основную БД, пока реплики догоняют запись.
+    stick_to_primary(response)
     return {"status": "OK"}
 
 
 @router.delete("/{hotel_id}")
-async def delete_hotel(hotel_id: int, db: DBDep):
+async def delete_hotel(hotel_id: int, db: DBDep, response: Response):
     """
     Удаляет отель по идентификатору.
 
     Args:
         hotel_id: Идентификатор отеля.
         db: Менеджер БД для доступа к репозиториям.
+        response: Объект ответа (cookie чтения из основной БД).
 
     Returns:
         Статус операции.
@@ -141,4 +235,6 @@ async def delete_hotel(hotel_id: int, db: DBDep):
     # Удаляем отель и фиксируем изменения.
     hotel = await db.hotels.delete(id=hotel_id)
     await db.commit()
+    # Следующие чтения клиента идут в основную БД, пока реплики догоняют запись.
+    stick_to_primary(response)
     return {"status": "OK"}
@@ -0,0 +1,46 @@
+# app/api/metrics.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.database import get_pool_stats
+from app.utils.jobs import job_queue
+from app.utils.query_stats import render_prometheus, statement_cache_metrics
+
+router = APIRouter(prefix="/metrics")
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """
+    Возвращает метрики SQL по маршрутам, метрики пула и фоновых задач в формате Prometheus.
+
+    Returns:
+        Текст в формате Prometheus exposition 0.0.4.
+    """
+    text = render_prometheus(get_pool_stats(), job_queue.metrics.as_dict())
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+@router.get("/pool")
+async def get_pool_metrics():
+    """
+    Возвращает метрики пулов соединений к основной БД и репликам.
+
+    Returns:
+        По движку (engine="primary", "replica-N"): размер пула, занятые/свободные соединения,
+        overflow и время ожидания соединений.
+    """
+    # Данные берутся из памяти процесса, запросов к БД нет.
+    return get_pool_stats()
+
+
+@router.get("/statement-cache")
+async def get_statement_cache_metrics():
+    """
+    Возвращает попадания в кэш подготовленных выражений asyncpg.
+
+    Returns:
+        Число попаданий и промахов и доля попаданий (None, пока запросов не было).
+    """
+    return statement_cache_metrics.as_dict()
@@ -0,0 +1,90 @@
+# app/api/reports.py
+
+from datetime import date
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.api.dependencies import DBDep, check_dates
+
+router = APIRouter(prefix="/reports")
+
+# Ограничение на длину периода посуточного отчета, чтобы ответ не рос неограниченно.
+MAX_OCCUPANCY_DAYS = 366
+
+
+@router.get("/revenue")
+async def get_revenue(
+        db: DBDep,
+        date_from: date = Query(description="Начало периода (по дате заезда)"),
+        date_to: date = Query(description="Конец периода, не включительно"),
+        hotel_id: int | None = Query(default=None, description="Только один отель"),
+        from_view: bool = Query(default=False, description="Читать из материализованного представления"),
+):
+    """
+    Возвращает выручку по отелям и месяцам.
+
+    Период округляется до целых месяцев: от месяца date_from до месяца последнего дня
+    периода включительно, одинаково для живого расчета и для представления.
+
+    Args:
+        db: Менеджер БД для доступа к репозиториям.
+        date_from: Начало периода.
+        date_to: Конец периода (не включительно).
+        hotel_id: Идентификатор отеля.
+        from_view: Читать готовые агрегаты из hotel_revenue_monthly.
+
+    Returns:
+        Список строк (отель, месяц, выручка, число бронирований).
+    """
+    check_dates(date_from, date_to)
+    return await db.reports.get_revenue_by_month(
+        date_from=date_from, date_to=date_to, hotel_id=hotel_id, from_view=from_view,
+    )
+
+
+@router.get("/occupancy")
+async def get_occupancy(
+        db: DBDep,
+        hotel_id: int = Query(description="Идентификатор отеля"),
+        date_from: date = Query(description="Первый день периода"),
+        date_to: date = Query(description="День после последнего дня периода"),
+):
+    """
+    Возвращает загрузку номеров отеля по дням.
+
+    Args:
+        db: Менеджер БД для доступа к репозиториям.
+        hotel_id: Идентификатор отеля.
+        date_from: Первый день периода.
+        date_to: День после последнего дня периода.
+
+    Returns:
+        Список строк (номер, день, занято, всего, доля занятости).
+    """
+    check_dates(date_from, date_to)
+    if (date_to - date_from).days > MAX_OCCUPANCY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Период не может быть длиннее {MAX_OCCUPANCY_DAYS} дней")
+    return await db.reports.get_occupancy_by_day(hotel_id=hotel_id, date_from=date_from, date_to=date_to)
+
+
+@router.get("/top-rooms")
+async def get_top_rooms(
+        db: DBDep,
+        date_from: date = Query(description="Начало периода (по дате заезда)"),
+        date_to: date = Query(description="Конец периода, не включительно"),
+        limit: int = Query(default=10, ge=1, le=100, description="Сколько номеров вернуть"),
+):
+    """
+    Возвращает номера с наибольшей выручкой за период.
+
+    Args:
+        db: Менеджер БД для доступа к репозиториям.
+        date_from: Начало периода.
+        date_to: Конец периода (не включительно).
+        limit: Сколько номеров вернуть.
+
+    Returns:
+        Список номеров с выручкой и числом бронирований.
+    """
+    check_dates(date_from, date_to)
+    return await db.reports.get_top_rooms(date_from=date_from, date_to=date_to, limit=limit)
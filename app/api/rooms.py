@@ -1,31 +1,53 @@
 # app/api/rooms.py
 
-from fastapi import APIRouter, Body
+from datetime import date
 
-from app.api.dependencies import DBDep
-from app.schemas.rooms import RoomAdd, RoomAddRequest, RoomPatchRequest, RoomPatch
+from fastapi import APIRouter, Body, HTTPException, Query, Response
+
+from app.api.dependencies import DBDep, ReadDBDep, check_dates, stick_to_primary
+from app.schemas.room_inventory import RoomDayAvailability
+from app.schemas.rooms import Room, RoomAdd, RoomAddRequest, RoomPatchRequest, RoomPatch
+from app.utils.responses import PydanticJSONResponse
 
 router = APIRouter(prefix="/hotels")
 
+# Календарь отдается не дальше чем на год вперед за один запрос.
+MAX_CALENDAR_DAYS = 366
+
 
-@router.get("/{hotel_id}/rooms")
-async def get_rooms(hotel_id: int, db: DBDep):
+@router.get("/{hotel_id}/rooms", response_model=list[Room])
+async def get_rooms(
+        hotel_id: int,
+        db: ReadDBDep,
+        date_from: date | None = Query(default=None, description="Дата заезда"),
+        date_to: date | None = Query(default=None, description="Дата выезда"),
+):
     """
     Возвращает список номеров отеля.
 
+    Если переданы даты, возвращаются только номера со свободными местами на период.
+
     Args:
         hotel_id: Идентификатор отеля.
         db: Менеджер БД для доступа к репозиториям.
+        date_from: Дата заезда.
+        date_to: Дата выезда.
 
     Returns:
         Список номеров указанного отеля.
     """
-    # Получаем все номера, относящиеся к указанному отелю.
-    return await db.rooms.get_filtered(hotel_id=hotel_id)
+    # Без дат возвращаем все номера, относящиеся к указанному отелю.
+    if not check_dates(date_from, date_to):
+        rooms = await db.rooms.get_filtered(hotel_id=hotel_id)
+    # Иначе считаем свободные номера на период одним агрегирующим запросом.
+    else:
+        rooms = await db.rooms.get_filtered_by_time(hotel_id=hotel_id, date_from=date_from, date_to=date_to)
+    # Модели из репозитория сериализуем сразу в байты, без повторной проверки FastAPI.
+    return PydanticJSONResponse(rooms, list[Room])
 
 
 @router.get("/{hotel_id}/rooms/{room_id}")
-async def get_room(hotel_id: int, room_id: int, db: DBDep):
+async def get_room(hotel_id: int, room_id: int, db: ReadDBDep):
     """
     Возвращает номер по его идентификатору в рамках отеля.
 
@@ -41,14 +63,51 @@ async def get_room(hotel_id: int, room_id: int, db: DBDep):
     return await db.rooms.get_one_or_none(id=room_id, hotel_id=hotel_id)
 
 
+@router.get("/{hotel_id}/rooms/{room_id}/calendar", response_model=list[RoomDayAvailability])
+async def get_room_calendar(
+        hotel_id: int,
+        room_id: int,
+        db: ReadDBDep,
+        date_from: date = Query(description="Первый день периода"),
+        date_to: date = Query(description="День после последнего дня периода"),
+):
+    """
+    Возвращает остаток свободных мест номера по каждому дню периода.
+
+    Args:
+        hotel_id: Идентификатор отеля.
+        room_id: Идентификатор номера.
+        db: Менеджер БД для доступа к репозиториям.
+        date_from: Первый день периода.
+        date_to: День после последнего дня периода.
+
+    Returns:
+        Список дней с числом занятых и свободных мест.
+
+    Raises:
+        HTTPException: 400, если период длиннее MAX_CALENDAR_DAYS; 404, если номер не найден.
+    """
+    check_dates(date_from, date_to)
+    if (date_to - date_from).days > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"Период не может быть длиннее {MAX_CALENDAR_DAYS} дней")
+    # Каждый день — одна строка room_inventory по первичному ключу (room_id, day).
+    calendar = await db.room_inventory.get_calendar(
+        hotel_id=hotel_id, room_id=room_id, date_from=date_from, date_to=date_to,
+    )
+    if not calendar:
+        raise HTTPException(status_code=404, detail="Номер не найден")
+    return PydanticJSONResponse(calendar, list[RoomDayAvailability])
+
+
 @router.post("/{hotel_id}/rooms")
-async def create_room(hotel_id: int, db: DBDep, room_data: RoomAddRequest = Body()):
+async def create_room(hotel_id: int, db: DBDep, response: Response, room_data: RoomAddRequest = Body()):
     """
     Создает номер в указанном отеле.
 
     Args:
         hotel_id: Идентификатор отеля.
         db: Менеджер БД для доступа к репозиториям.
+        response: Объект ответа (cookie чтения из основной БД).
         room_data: Данные номера из запроса.
 
     Returns:
@@ -59,11 +118,37 @@ async def create_room(hotel_id: int, db: DBDep, room_data: RoomAddRequest = Body
     # Сохраняем номер и фиксируем транзакцию.
     room = await db.rooms.add(_room_data)
     await db.commit()
+    # Следующие чтения клиента идут в основную БД, пока реплики догоняют запись.
+    stick_to_primary(response)
     return {"status": "OK", "data": room}
 
 
+@router.post("/{hotel_id}/rooms/bulk")
+async def create_rooms_bulk(hotel_id: int, db: DBDep, response: Response, rooms_data: list[RoomAddRequest] = Body()):
+    """
+    Создает много номеров в указанном отеле одним запросом к БД.
+
+    Args:
+        hotel_id: Идентификатор отеля.
+        db: Менеджер БД для доступа к репозиториям.
+        response: Объект ответа (cookie чтения из основной БД).
+        rooms_data: Список данных номеров.
+
+    Returns:
+        Статус операции и id созданных номеров в порядке входного списка.
+    """
+    # Привязываем каждый номер к отелю.
+    _rooms_data = [RoomAdd(hotel_id=hotel_id, **room_data.model_dump()) for room_data in rooms_data]
+    # Вставляем номера многострочным INSERT и фиксируем одной транзакцией.
+    rooms_ids = await db.rooms.add_bulk(_rooms_data)
+    await db.commit()
+    # Следующие чтения клиента идут в основную БД, пока реплики догоняют запись.
+    stick_to_primary(response)
+    return {"status": "OK", "data": rooms_ids}
+
+
 @router.put("/{hotel_id}/rooms/{room_id}")
-async def edit_room(hotel_id: int, room_id: int, room_data: RoomAddRequest, db: DBDep,):
+async def edit_room(hotel_id: int, room_id: int, room_data: RoomAddRequest, db: DBDep, response: Response):
     """
     Полностью обновляет данные номера.
 
@@ -72,6 +157,7 @@ async def edit_room(hotel_id: int, room_id: int, room_data: RoomAddRequest, db:
         room_id: Идентификатор номера.
         room_data: Новые данные номера.
         db: Менеджер БД для доступа к репозиториям.
+        response: Объект ответа (cookie чтения из основной БД).
 
     Returns:
         Статус операции.
@@ -81,6 +167,8 @@ async def edit_room(hotel_id: int, room_id: int, room_data: RoomAddRequest, db:
     # Обновляем номер и фиксируем транзакцию.
     await db.rooms.edit(_room_data, id=room_id)
     await db.commit()
+    # Следующие чтения клиента идут в основную БД, пока реплики догоняют запись.
+    stick_to_primary(response)
     return {"status": "OK"}
 
 
@@ -90,6 +178,7 @@ async def partially_edit_room(
         room_id: int,
         room_data: RoomPatchRequest,
         db: DBDep,
+        response: Response,
 ):
     """
     Частично обновляет данные номера.
@@ -99,6 +188,7 @@ async def partially_edit_room(
         room_id: Идентификатор номера.
         room_data: Частичные данные номера.
         db: Менеджер БД для доступа к репозиториям.
+        response: Объект ответа (cookie чтения из основной БД).
 
     Returns:
         Статус операции.
@@ -108,11 +198,13 @@ async def partially_edit_room(
     # Обновляем номер с учетом отеля и фиксируем транзакцию.
     await db.rooms.edit(_room_data, exclude_unset=True, id=room_id, hotel_id=hotel_id)
     await db.commit()
+    # Следующие чтения клиента идут в основную БД, пока реплики догоняют запись.
+    stick_to_primary(response)
     return {"status": "OK"}
 
 
 @router.delete("/{hotel_id}/rooms/{room_id}")
-async def delete_room(hotel_id: int, room_id: int, db: DBDep):
+async def delete_room(hotel_id: int, room_id: int, db: DBDep, response: Response):
     """
     Удаляет номер из указанного отеля.
 
@@ -120,6 +212,7 @@ async def delete_room(hotel_id: int, room_id: int, db: DBDep):
         hotel_id: Идентификатор отеля.
         room_id: Идентификатор номера.
         db: Менеджер БД для доступа к репозиториям.
+        response: Объект ответа (cookie чтения из основной БД).
 
     Returns:
         Статус операции.
@@ -127,4 +220,6 @@ async def delete_room(hotel_id: int, room_id: int, db: DBDep):
     # Удаляем номер и фиксируем изменения.
     await db.rooms.delete(id=room_id, hotel_id=hotel_id)
     await db.commit()
+    # Следующие чтения клиента идут в основную БД, пока реплики догоняют запись.
+    stick_to_primary(response)
     return {"status": "OK"}
@@ -1,4 +1,6 @@
 from pathlib import Path
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # определяем абсолютный путь до корня проекта
@@ -20,9 +22,68 @@ class Settings(BaseSettings):
     def DB_URL_SYNC(self):
         return f"postgresql+psycopg2://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
     
-    JWT_SECRET_KEY: str
+    # Пул соединений к БД (значения по умолчанию совпадают с дефолтами SQLAlchemy/asyncpg).
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # сколько секунд ждать свободное соединение
+    DB_POOL_PRE_PING: bool = False  # проверять соединение перед выдачей (+1 round trip)
+    DB_POOL_RECYCLE: int = -1  # пересоздавать соединения старше N секунд (-1 — никогда)
+    DB_STATEMENT_CACHE_SIZE: int = 100  # кэш подготовленных выражений asyncpg на соединение
+
+    # Реплики для чтения: полные DSN (postgresql+asyncpg://...), в .env — JSON-список.
+    # Пустой список — все запросы идут в основную БД.
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_RETRY_SECONDS: float = 30.0  # сколько не отправлять запросы на недоступную реплику (проверка — вдвое чаще)
+    # Сколько секунд после бронирования читать из основной БД (read-your-writes при лаге реплик).
+    DB_REPLICA_STICKY_SECONDS: int = 10
+    # Наибольшее ожидаемое отставание реплик: столько секунд после изменения таблицы
+    # прочитанное с реплики не кладется в кэш (там могут быть еще старые строки).
+    DB_REPLICA_MAX_LAG_SECONDS: int = 10
+
+    # Структурированный лог SQL: доля записываемых запросов (0..1) и запись параметров.
+    SQL_LOG_ENABLED: bool = False
+    SQL_LOG_SAMPLE_RATE: float = 1.0
+    SQL_LOG_PARAMETERS: bool = False
+    # Порог медленного SQL-выражения (мс): такие выражения пишутся в лог вместе с маршрутом.
+    SLOW_QUERY_MS: float = 200.0
+
+    # Сколько часов хранить ключи идемпотентности (заголовок Idempotency-Key) и ответы по ним.
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+
+    JWT_SECRET_KEY: str = ""  # нужен только для HS-алгоритмов
     JWT_ALGORITHM: str
+    # Асимметричная подпись (RS256/ES256/EdDSA): закрытый ключ в PEM и его идентификатор (kid).
+    JWT_PRIVATE_KEY_PATH: Path | None = None
+    JWT_KEY_ID: str | None = None
+    # Дополнительные открытые ключи для ротации, JSON вида {"kid": "path/to/key.pub.pem"}.
+    JWT_PUBLIC_KEYS: dict[str, Path] = {}
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # Кэш проверенных токенов: сколько хранить и как долго (но не дольше claim "exp").
+    JWT_CACHE_MAX_ITEMS: int = 10_000
+    JWT_CACHE_TTL_SECONDS: int = 60
+
+    # Стоимость Argon2 (по умолчанию — значения passlib) и пул потоков для хэширования паролей.
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 102_400  # в КиБ
+    ARGON2_PARALLELISM: int = 8
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # сверх этого числа ожидающих хэширований отвечаем 503
+
+    # Кэш чтения отелей и номеров: none — выключен, memory — LRU в процессе, redis — общий для всех воркеров.
+    CACHE_BACKEND: Literal["none", "memory", "redis"] = "none"
+    CACHE_TTL_SECONDS: int = 60
+    CACHE_MAX_ITEMS: int = 10_000
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Фоновые задачи: memory — очередь в процессе (теряется при рестарте),
+    # postgres — таблица jobs, задача записывается в той же транзакции, что и данные.
+    JOBS_BACKEND: Literal["memory", "postgres"] = "memory"
+    JOBS_WORKERS: int = 4
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_RETRY_DELAY_SECONDS: float = 5.0  # задержка перед повтором, удваивается с каждой попыткой
+    JOBS_POLL_INTERVAL_SECONDS: float = 1.0  # как часто воркеры опрашивают таблицу jobs
+    JOBS_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0  # сколько ждать завершения задач при остановке
+    JOBS_LEASE_SECONDS: float = 300.0  # на сколько задача закрепляется за воркером (дольше любой задачи)
 
     model_config = SettingsConfigDict(
         # pathlib позволяет формировать путь с помощью оператора "/", аналогично os.path.join()
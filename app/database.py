@@ -1,15 +1,130 @@
+import time
+from dataclasses import dataclass, asdict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
+from app.utils.query_stats import record_pool_wait, setup_query_stats
+from app.utils.replicas import ReplicaRouter
+from app.utils.sql_log import setup_sql_logging
+
+
+@dataclass
+class PoolMetrics:
+    """Счетчики ожидания соединений из пула (с момента старта процесса)."""
+    checkouts: int = 0
+    checkout_wait_seconds_total: float = 0.0
+    checkout_wait_seconds_max: float = 0.0
+    checkout_timeouts: int = 0
+
+
+class MeasuredQueuePool(AsyncAdaptedQueuePool):
+    """Стандартный асинхронный пул, который замеряет время ожидания соединения."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Счетчики у каждого пула свои: у основной БД и у каждой реплики отдельно.
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # dispose() и сброс пула после ошибок создают новый объект пула — счетчики переносим в него.
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+    def connect(self):
+        # Замеряем время выдачи соединения: ожидание свободного, создание нового или pre-ping.
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.metrics.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.metrics.checkouts += 1
+            self.metrics.checkout_wait_seconds_total += waited
+            self.metrics.checkout_wait_seconds_max = max(self.metrics.checkout_wait_seconds_max, waited)
+            record_pool_wait(waited)
+
 
+def create_engine_with_pool(url: str):
+    """
+    Создает асинхронный движок с пулом из настроек и счетчиками SQL по запросам.
 
-# Создадим движок для подключения к нашей БД
-engine = create_async_engine(settings.DB_URL)
+    Args:
+        url: DSN базы данных.
+
+    Returns:
+        Асинхронный движок SQLAlchemy.
+    """
+    new_engine = create_async_engine(
+        url,
+        poolclass=MeasuredQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+    # Счетчики SQL по HTTP-запросам и лог медленных запросов (порог SLOW_QUERY_MS)
+    setup_query_stats(new_engine)
+    return new_engine
+
+
+# Создадим движок для подключения к нашей БД; параметры пула берем из настроек
+engine = create_engine_with_pool(settings.DB_URL)
+# Движки реплик для чтения (по одному пулу на реплику)
+replica_engines = [create_engine_with_pool(url) for url in settings.DB_REPLICA_URLS]
+
+# Лог SQL-запросов (включается настройкой SQL_LOG_ENABLED)
+sql_log_listener = setup_sql_logging(engine, *replica_engines)
+
+
+def get_pool_stats() -> list[dict]:
+    """
+    Возвращает текущее состояние пулов соединений и накопленные метрики ожидания.
+
+    Returns:
+        По словарю на движок: метка engine ("primary", "replica-0", ...), размер пула,
+        число занятых/свободных соединений, overflow и метрики ожидания.
+    """
+    # Номера реплик совпадают с номерами в логах ReplicaRouter.
+    pools = [("primary", engine.pool)] + [
+        (f"replica-{index}", replica_engine.pool) for index, replica_engine in enumerate(replica_engines)
+    ]
+    return [
+        {
+            "engine": name,
+            "size": pool.size(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # overflow() отрицателен, пока пул не заполнен до pool_size; наружу отдаем только превышение.
+            "overflow": max(pool.overflow(), 0),
+            **asdict(pool.metrics),
+        }
+        for name, pool in pools
+    ]
 
 # Создадим фабрику, которая генерирует сессии. По сути, Сессия == Транзакция
 async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
 
+# Чтение: реплики по кругу, при их недоступности — основная БД
+read_router = ReplicaRouter(
+    primary_session_maker=async_session_maker,
+    replicas=[
+        # Метка в session.info: репозиторий не кэширует чтения с отстающей реплики (см. Cache).
+        (replica_engine, async_sessionmaker(bind=replica_engine, expire_on_commit=False, info={"replica": True}))
+        for replica_engine in replica_engines
+    ],
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
+
 # Создаем пустой класс для моделей. 
 # В нем наследован парамер metadata, который булет содержать все данные о наших моделях.
 class BaseModel(DeclarativeBase):
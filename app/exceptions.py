@@ -0,0 +1,13 @@
+# app/exceptions.py
+
+
+class BYHotelsException(Exception):
+    """Базовое исключение приложения; detail — текст для ответа клиенту."""
+    detail = "Неожиданная ошибка"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(self.detail, *args, **kwargs)
+
+
+class AllRoomsAreBookedException(BYHotelsException):
+    detail = "Не осталось свободных номеров"
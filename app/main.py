@@ -1,6 +1,8 @@
 # ./main.py
 
-from fastapi import FastAPI, Path, Query, Body
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Path, Query, Body, Request
 import uvicorn
 
 import sys
@@ -11,20 +13,74 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from app.api.hotels import router as router_hotels
 from app.api.rooms import router as router_rooms
-from app.api.auth import router as router_auth
+from app.api.auth import router as router_auth, well_known_router as router_well_known
 from app.api.bookings import router as router_bookings
+from app.api.metrics import router as router_metrics
+from app.api.reports import router as router_reports
+from app.database import async_session_maker, engine, read_router, replica_engines, sql_log_listener
+from app.utils.jobs import job_queue
+from app.utils.query_stats import finish_request, start_request
+from app.services import booking_jobs  # noqa: F401 — регистрирует обработчики фоновых задач
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Старт: запускаем воркеры фоновых задач и фоновую проверку реплик.
+    await job_queue.start(async_session_maker)
+    read_router.start()
+    yield
+    # Остановка: сначала дожидаемся фоновых задач (им нужна БД), потом закрываем пулы соединений.
+    await job_queue.stop()
+    await read_router.stop()
+    for db_engine in (engine, *replica_engines):
+        await db_engine.dispose()
+    if sql_log_listener is not None:
+        sql_log_listener.stop()
 
 
 app = FastAPI(
     title="BY_Hotels",
     summary="https://lk.pytex.school/teach/control/stream/view/id/934873195",
     description="Второй курс Артема Шумейко",
+    lifespan=lifespan,
 )
 
+
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    # Считаем SQL-выражения, время в БД и ожидание пула для каждого запроса
+    # и отдаем их клиенту в заголовке Server-Timing (видно в DevTools браузера).
+    stats = start_request(request.method, request.scope)
+    try:
+        response = await call_next(request)
+    except BaseException:
+        # Необработанная ошибка — запрос все равно учитывается в метриках маршрута.
+        finish_request(stats)
+        raise
+    # Заголовки уходят до тела: в Server-Timing попадают запросы до начала ответа.
+    response.headers["Server-Timing"] = stats.server_timing()
+    body_iterator = response.body_iterator
+
+    async def body_with_stats():
+        # Тело (например, StreamingResponse выгрузки бронирований) тоже читает БД:
+        # метрики маршрута фиксируются, только когда оно отдано целиком или прервано.
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            finish_request(stats)
+
+    response.body_iterator = body_with_stats()
+    return response
+
+
 app.include_router(router_auth, tags=["Auth"])
+app.include_router(router_well_known, tags=["Auth"])
 app.include_router(router_hotels, tags=["Hotels"])
 app.include_router(router_rooms, tags=["Rooms"])
 app.include_router(router_bookings, tags=["Bookings"])
+app.include_router(router_reports, tags=["Reports"])
+app.include_router(router_metrics, tags=["Metrics"])
 
 
 if __name__ == "__main__":
@@ -11,6 +11,9 @@ from app.models.hotels import HotelsOrm
 from app.models.rooms import RoomsOrm
 from app.models.users import UsersOrm
 from app.models.bookings import BookingsOrm
+from app.models.idempotency_keys import IdempotencyKeysOrm
+from app.models.jobs import JobsOrm
+from app.models.room_inventory import RoomInventoryOrm
 
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,47 @@
+"""hotels trigram indexes
+
+Revision ID: 00a94af6c20e
+Revises: d8045833a238
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "00a94af6c20e"
+down_revision: Union[str, Sequence[str], None] = "d8045833a238"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm позволяет GIN-индексу обслуживать ILIKE '%...%' и similarity().
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_hotels_title_trgm",
+        "hotels",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_hotels_location_trgm",
+        "hotels",
+        ["location"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"location": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_hotels_location_trgm", table_name="hotels", postgresql_using="gin")
+    op.drop_index("ix_hotels_title_trgm", table_name="hotels", postgresql_using="gin")
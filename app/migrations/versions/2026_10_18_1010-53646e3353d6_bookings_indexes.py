@@ -0,0 +1,57 @@
+"""bookings indexes
+
+Revision ID: 53646e3353d6
+Revises: 00a94af6c20e
+Create Date: 2026-10-18 10:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "53646e3353d6"
+down_revision: Union[str, Sequence[str], None] = "00a94af6c20e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gist нужен, чтобы в одном GiST-индексе были и room_id (=), и диапазон дат (&&).
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # Таблица большая, поэтому строим индексы CONCURRENTLY (без блокировки записи),
+    # а это возможно только вне транзакции.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_bookings_room_id", "bookings", ["room_id"],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_bookings_user_id", "bookings", ["user_id"],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_bookings_date_from_date_to", "bookings", ["date_from", "date_to"],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_bookings_room_id_during",
+            "bookings",
+            ["room_id", sa.text("daterange(date_from, date_to)")],
+            unique=False,
+            postgresql_using="gist",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_bookings_room_id_during", table_name="bookings", postgresql_concurrently=True)
+        op.drop_index("ix_bookings_date_from_date_to", table_name="bookings", postgresql_concurrently=True)
+        op.drop_index("ix_bookings_user_id", table_name="bookings", postgresql_concurrently=True)
+        op.drop_index("ix_bookings_room_id", table_name="bookings", postgresql_concurrently=True)
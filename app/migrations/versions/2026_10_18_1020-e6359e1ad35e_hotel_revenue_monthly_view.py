@@ -0,0 +1,50 @@
+"""hotel revenue monthly view
+
+Revision ID: e6359e1ad35e
+Revises: 53646e3353d6
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6359e1ad35e"
+down_revision: Union[str, Sequence[str], None] = "53646e3353d6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Выручка по отелям и месяцам (месяц — по дате заезда). Отчет читает готовые строки
+    # вместо GROUP BY по всей таблице бронирований.
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW hotel_revenue_monthly AS
+        SELECT
+            rooms.hotel_id AS hotel_id,
+            date_trunc('month', bookings.date_from)::date AS month,
+            sum(bookings.price * (bookings.date_to - bookings.date_from)) AS revenue,
+            count(*) AS bookings_count
+        FROM bookings
+        JOIN rooms ON rooms.id = bookings.room_id
+        GROUP BY rooms.hotel_id, date_trunc('month', bookings.date_from)::date
+        """
+    )
+    # Уникальный индекс обязателен для REFRESH MATERIALIZED VIEW CONCURRENTLY.
+    op.create_index(
+        "ix_hotel_revenue_monthly_hotel_id_month",
+        "hotel_revenue_monthly",
+        ["hotel_id", "month"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW hotel_revenue_monthly")
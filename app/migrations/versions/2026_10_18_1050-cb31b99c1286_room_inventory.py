@@ -0,0 +1,47 @@
+"""room inventory
+
+Revision ID: cb31b99c1286
+Revises: 6997a754371f
+Create Date: 2026-10-18 10:50:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "cb31b99c1286"
+down_revision: Union[str, Sequence[str], None] = "6997a754371f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "room_inventory",
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("booked_count", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["room_id"], ["rooms.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("room_id", "day"),
+    )
+    op.create_index("ix_room_inventory_day", "room_inventory", ["day"], unique=False)
+    # Первичное заполнение из существующих бронирований: каждое раскладывается на дни [date_from, date_to).
+    op.execute(
+        """
+        INSERT INTO room_inventory (room_id, day, booked_count)
+        SELECT room_id, day::date, count(*)
+        FROM bookings, generate_series(date_from, date_to - 1, interval '1 day') AS day
+        GROUP BY room_id, day
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_room_inventory_day", table_name="room_inventory")
+    op.drop_table("room_inventory")
@@ -1,23 +1,60 @@
 # app/models/bookings.py
 
 from datetime import date
+from typing import TYPE_CHECKING
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, ForeignKey, Index, func
 
 from app.database import BaseModel
 
+if TYPE_CHECKING:
+    from app.models.rooms import RoomsOrm
+
 
 class BookingsOrm(BaseModel):
     __tablename__ = "bookings"
+    # Индекс по периоду проживания для выборок по датам
+    __table_args__ = (
+        Index("ix_bookings_date_from_date_to", "date_from", "date_to"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)  # уникальный первичный ключ
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))  # внешний ключ
-    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id"))  # внешний ключ
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)  # внешний ключ
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id"), index=True)  # внешний ключ
     date_from: Mapped[date]
     date_to: Mapped[date]
     price: Mapped[int]               # цена за одну ночь
 
+    # Связь загружается только явно, см. HotelsOrm.rooms
+    room: Mapped["RoomsOrm"] = relationship(back_populates="bookings", lazy="raise")
+
     @hybrid_property
     def total_cost(self) -> int:
-        return self.price * (self.date_to - self.date_from).days
\ No newline at end of file
+        return self.price * (self.date_to - self.date_from).days
+
+    @total_cost.inplace.expression
+    @classmethod
+    def _total_cost_expression(cls):
+        # В PostgreSQL date - date дает число дней, поэтому .days в SQL не нужен.
+        return cls.price * (cls.date_to - cls.date_from)
+
+    @classmethod
+    def during(cls):
+        """
+        Возвращает SQL-выражение периода бронирования как daterange [date_from, date_to).
+
+        Returns:
+            SQL-выражение диапазона дат, по которому построен GiST-индекс.
+        """
+        return func.daterange(cls.date_from, cls.date_to)
+
+
+# GiST-индекс (расширение btree_gist) по номеру и периоду: проверка пересечения
+# периодов (&&) для конкретного номера становится поиском по индексу.
+Index(
+    "ix_bookings_room_id_during",
+    BookingsOrm.room_id,
+    BookingsOrm.during(),
+    postgresql_using="gist",
+)
\ No newline at end of file
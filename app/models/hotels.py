@@ -1,12 +1,26 @@
+from typing import TYPE_CHECKING
+
 from app.database import BaseModel
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Index, String
+
+if TYPE_CHECKING:
+    from app.models.rooms import RoomsOrm
 
 
 # Создаем модель таблицы "Отели", которая отображает будущую реальную таблицу в БД
 class HotelsOrm(BaseModel):
     __tablename__ = "hotels"
+    # Триграммные GIN-индексы (расширение pg_trgm) для поиска подстроки через ILIKE
+    __table_args__ = (
+        Index("ix_hotels_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_hotels_location_trgm", "location", postgresql_using="gin", postgresql_ops={"location": "gin_trgm_ops"}),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)  # уникальный первичный ключ
     title: Mapped[str] = mapped_column(String(100))  # максимум 100 символов в названии
-    location: Mapped[str]  # на локацию ограничений нет, поэтому не нужна mapped_column
\ No newline at end of file
+    location: Mapped[str]  # на локацию ограничений нет, поэтому не нужна mapped_column
+
+    # Номера отеля. lazy="raise": в async неявная подгрузка невозможна, поэтому номера
+    # загружаются только явно (selectinload) — так N+1 не появится незаметно.
+    rooms: Mapped[list["RoomsOrm"]] = relationship(back_populates="hotel", lazy="raise")
\ No newline at end of file
@@ -0,0 +1,22 @@
+# app/models/idempotency_keys.py
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import BaseModel
+
+
+class IdempotencyKeysOrm(BaseModel):
+    __tablename__ = "idempotency_keys"
+
+    # Ключ уникален в пределах пользователя: составной первичный ключ дает поиск за одно обращение к индексу.
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # sha256 тела запроса: повтор с тем же ключом, но другими данными — ошибка клиента.
+    request_hash: Mapped[str] = mapped_column(String(64))
+    # Ответ исходного запроса; NULL, пока запрос еще выполняется.
+    response: Mapped[dict | None] = mapped_column(JSONB)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
\ No newline at end of file
@@ -0,0 +1,28 @@
+# app/models/jobs.py
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import BaseModel
+
+
+class JobsOrm(BaseModel):
+    __tablename__ = "jobs"
+    # Частичный индекс только по ожидающим задачам: опрос воркеров не читает проваленные.
+    __table_args__ = (
+        Index("ix_jobs_pending_run_at", "run_at", postgresql_where="failed_at IS NULL"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(100))
+    payload: Mapped[dict] = mapped_column(JSONB)
+    attempts: Mapped[int] = mapped_column(default=0, server_default="0")
+    # Не раньше этого момента задачу можно выполнять (для повторов — с задержкой).
+    run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_error: Mapped[str | None] = mapped_column(Text)
+    # Задача исчерпала попытки; строка остается для разбора.
+    failed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
@@ -0,0 +1,23 @@
+# app/models/room_inventory.py
+
+from datetime import date
+
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import BaseModel
+
+
+class RoomInventoryOrm(BaseModel):
+    __tablename__ = "room_inventory"
+    # Поиск отелей без фильтра по отелю читает все номера за период — по дню, а не по номеру.
+    __table_args__ = (
+        Index("ix_room_inventory_day", "day"),
+    )
+
+    # Одна строка на номер и день; первичный ключ (room_id, day) превращает запрос
+    # календаря или проверку остатка на период в чтение диапазона индекса.
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(primary_key=True)
+    # Сколько мест номера занято бронированиями, у которых date_from <= day < date_to.
+    booked_count: Mapped[int] = mapped_column(default=0, server_default="0")
\ No newline at end of file
@@ -1,7 +1,13 @@
+from typing import TYPE_CHECKING
+
 from app.database import BaseModel
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String, ForeignKey
 
+if TYPE_CHECKING:
+    from app.models.bookings import BookingsOrm
+    from app.models.hotels import HotelsOrm
+
 
 # Создаем модель таблицы "Номера", которая отображает будущую реальную таблицу в БД
 class RoomsOrm(BaseModel):
@@ -12,4 +18,8 @@ class RoomsOrm(BaseModel):
     title: Mapped[str]
     description: Mapped[str | None]  # необязательный параметр
     price: Mapped[int]               # для упрощения цена без копеек
-    quantity: Mapped[int]
\ No newline at end of file
+    quantity: Mapped[int]
+
+    # Связи загружаются только явно (selectinload/joinedload), см. HotelsOrm.rooms
+    hotel: Mapped["HotelsOrm"] = relationship(back_populates="rooms", lazy="raise")
+    bookings: Mapped[list["BookingsOrm"]] = relationship(back_populates="room", lazy="raise")
\ No newline at end of file
@@ -1,41 +1,225 @@
-from pydantic import BaseModel as SH_BaseModel
-from sqlalchemy import select, insert, update, delete
-from typing import ClassVar, Type
+from functools import cache as memoize
+
+from pydantic import BaseModel as SH_BaseModel, TypeAdapter
+from sqlalchemy import bindparam, select, insert, update, delete
+from typing import AsyncIterator, ClassVar, Sequence, Type
 
 from app.database import BaseModel as DB_BaseModel
+from app.utils.cache import cache
 from pydantic import BaseModel
 
 
+@memoize
+def type_adapter(tp) -> TypeAdapter:
+    """
+    Возвращает TypeAdapter для типа, создавая его один раз на процесс.
+
+    Args:
+        tp: тип (например, list[Hotel]).
+
+    Returns:
+        TypeAdapter для сериализации значений кэша.
+    """
+    return TypeAdapter(tp)
+
+
+@memoize
+def schema_columns(model, schema) -> tuple:
+    """
+    Возвращает столбцы таблицы модели, соответствующие полям Pydantic-схемы.
+
+    Args:
+        model: ORM-модель.
+        schema: Pydantic-схема.
+
+    Returns:
+        Кортеж столбцов таблицы в порядке полей схемы.
+    """
+    table = model.__table__
+    return tuple(table.c[name] for name in schema.model_fields if name in table.c)
+
+
+@memoize
+def lookup_statement(model, schema, columns: tuple[str, ...], for_update: bool = False):
+    """
+    Возвращает параметризованный SELECT по равенству столбцов, собранный один раз на процесс.
+
+    Один и тот же объект запроса при каждом вызове: SQLAlchemy не строит его заново,
+    ключ кэша компиляции вычисляется быстрее, а текст SQL совпадает байт в байт,
+    поэтому asyncpg берет подготовленное выражение из своего кэша на соединении.
+
+    Args:
+        model: ORM-модель.
+        schema: Pydantic-схема результата (выбираются только ее столбцы).
+        columns: имена столбцов фильтра (отсортированные), значения передаются при выполнении.
+        for_update: добавить FOR UPDATE.
+
+    Returns:
+        SELECT с bindparam под каждый столбец.
+    """
+    query = (
+        select(*schema_columns(model, schema))
+        .filter(*(getattr(model, column) == bindparam(column) for column in columns))
+    )
+    if for_update:
+        query = query.with_for_update()
+    return query
+
+
 class BaseRepository:
     # покажем линтеру что model это переменная, относящаяся к классу BaseModel. Иначе ругается.
     model: ClassVar[Type[DB_BaseModel]]
     schema: ClassVar[Type[BaseModel]]
+    # Пространство имен кэша чтения; None — репозиторий не кэшируется.
+    cache_namespace: ClassVar[str | None] = None
 
     def __init__(self, session):
         self.session = session
 
+    def cache_key(self, kind: str, filter_by: dict) -> str:
+        """
+        Строит ключ кэша из вида запроса и фильтров (порядок фильтров не важен).
+
+        Args:
+            kind: вид запроса (например, "filtered").
+            filter_by: параметры фильтрации.
+
+        Returns:
+            Строка ключа.
+        """
+        return kind + ":" + ",".join(f"{key}={value}" for key, value in sorted(filter_by.items()))
+
+    def lookup(self, filter_by: dict, for_update: bool = False, schema=None):
+        """
+        Подбирает готовый запрос под набор фильтров (id, hotel_id, user_id, email и т.п.).
+
+        Запрос выбирает столбцы таблицы (Core), а не ORM-объекты: строки не попадают
+        в identity map сессии, и схемы строятся прямо из кортежей (см. validate_rows).
+
+        Args:
+            filter_by: параметры фильтрации.
+            for_update: заблокировать найденные строки до конца транзакции.
+            schema: схема результата (по умолчанию self.schema).
+
+        Returns:
+            Кортеж (запрос, параметры выполнения).
+        """
+        schema = schema or self.schema
+        # filter_by(x=None) дает "x IS NULL", а bindparam — "x = NULL"; такие фильтры собираем как раньше.
+        if any(value is None for value in filter_by.values()):
+            query = select(*schema_columns(self.model, schema)).filter_by(**filter_by)
+            return (query.with_for_update() if for_update else query), {}
+        return lookup_statement(self.model, schema, tuple(sorted(filter_by)), for_update), filter_by
+
+    def validate_rows(self, keys, rows, schema=None) -> list:
+        """
+        Строит Pydantic-схемы из строк Core-запроса одной проверкой списка в pydantic-core.
+
+        Args:
+            keys: имена столбцов результата (result.keys()).
+            rows: строки результата (кортежи).
+            schema: схема результата (по умолчанию self.schema).
+
+        Returns:
+            Список Pydantic-схем.
+        """
+        keys = tuple(keys)
+        return type_adapter(list[schema or self.schema]).validate_python([dict(zip(keys, row)) for row in rows])
+
+    def mark_changed(self) -> None:
+        """
+        Помечает пространство имен кэша измененным в текущей транзакции.
+
+        Инвалидация выполняется в DBManager.commit() после коммита, чтобы параллельный
+        запрос не успел положить в кэш данные, которые еще не зафиксированы.
+        """
+        if self.cache_namespace is not None:
+            self.session.info.setdefault("changed_namespaces", set()).add(self.cache_namespace)
+
     async def get_filtered(self, **filter_by):
-        query = select(self.model).filter_by(**filter_by)
-        result = await self.session.execute(query)
-        return [self.schema.model_validate(model) for model in result.scalars().all()]
+        # Для кэшируемых репозиториев сначала смотрим в кэш, в БД идем только при промахе.
+        if cache is not None and self.cache_namespace is not None:
+            return await cache.get_or_load(
+                self.cache_namespace,
+                self.cache_key("filtered", filter_by),
+                lambda: self.get_filtered_uncached(**filter_by),
+                type_adapter(list[self.schema]),
+                from_replica=self.session.info.get("replica", False),
+            )
+        return await self.get_filtered_uncached(**filter_by)
+
+    async def get_filtered_uncached(self, **filter_by):
+        query, params = self.lookup(filter_by)
+        result = await self.session.execute(query, params)
+        return self.validate_rows(result.keys(), result.all())
+
+    async def stream_filtered(self, batch_size: int = 1000, **filter_by) -> AsyncIterator[list[BaseModel]]:
+        """
+        Отдает строки пачками через серверный курсор, не загружая всю таблицу в память.
+
+        Args:
+            batch_size: сколько строк забирать из курсора за раз.
+            **filter_by: параметры фильтрации.
+
+        Returns:
+            Асинхронный итератор списков Pydantic-схем.
+        """
+        query, params = self.lookup(filter_by)
+        # session.stream() открывает серверный курсор: в памяти одновременно только одна пачка.
+        # Строки — кортежи Core, в identity map сессии они не копятся.
+        result = await self.session.stream(query, params, execution_options={"yield_per": batch_size})
+        keys = result.keys()
+        async for rows in result.partitions():
+            yield self.validate_rows(keys, rows)
 
     async def get_all(self, *args, **kwargs):
         return await self.get_filtered()
     
     async def get_one_or_none(self, **filter_by):
-        query = select(self.model).filter_by(**filter_by)
-        result = await self.session.execute(query)
-        model = result.scalars().one_or_none()
-        if model is None:
+        if cache is not None and self.cache_namespace is not None:
+            return await cache.get_or_load(
+                self.cache_namespace,
+                self.cache_key("one", filter_by),
+                lambda: self.get_one_or_none_uncached(**filter_by),
+                type_adapter(self.schema | None),
+                from_replica=self.session.info.get("replica", False),
+            )
+        return await self.get_one_or_none_uncached(**filter_by)
+
+    async def get_one_or_none_uncached(self, **filter_by):
+        query, params = self.lookup(filter_by)
+        result = await self.session.execute(query, params)
+        row = result.one_or_none()
+        if row is None:
             return None
-        return self.schema.model_validate(model)
+        return self.schema.model_validate(row._asdict())
     
     async def add(self, data: SH_BaseModel):
         add_data_stmt = insert(self.model).values(**data.model_dump()).returning(self.model)
         result = await self.session.execute(add_data_stmt)
         model = result.scalars().one()
+        self.mark_changed()
         return self.schema.model_validate(model)
     
+    async def add_bulk(self, data: Sequence[SH_BaseModel]) -> list[int]:
+        """
+        Добавляет много строк за один запрос.
+
+        Args:
+            data: список Pydantic-схем для вставки.
+
+        Returns:
+            Список id созданных строк в порядке входных данных.
+        """
+        if not data:
+            return []
+        # Список параметров SQLAlchemy склеивает в многострочный INSERT ... VALUES (...), (...)
+        # и сам режет его на пачки под лимит параметров PostgreSQL (insertmanyvalues).
+        add_data_stmt = insert(self.model).returning(self.model.id, sort_by_parameter_order=True)
+        result = await self.session.execute(add_data_stmt, [item.model_dump() for item in data])
+        self.mark_changed()
+        return list(result.scalars().all())
+
     async def edit(self, data: SH_BaseModel, exclude_unset: bool = False, **filter_by) -> None:
         update_stmt = (
             update(self.model)
@@ -43,7 +227,9 @@ class BaseRepository:
             .values(data.model_dump(exclude_unset=exclude_unset))
         )
         await self.session.execute(update_stmt)
+        self.mark_changed()
 
     async def delete(self, **filter_by) -> None:
         delete_stmt = delete(self.model).filter_by(**filter_by)
         await self.session.execute(delete_stmt)
+        self.mark_changed()
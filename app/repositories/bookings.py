@@ -1,8 +1,168 @@
+from functools import cached_property
+from typing import Sequence
+
+from pydantic import BaseModel as SH_BaseModel
+from sqlalchemy import Integer, any_, bindparam, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.exceptions import AllRoomsAreBookedException
 from app.models.bookings import BookingsOrm
-from app.repositories.base import BaseRepository
-from app.schemas.bookings import Booking
+from app.models.room_inventory import RoomInventoryOrm
+from app.models.rooms import RoomsOrm
+from app.repositories.base import BaseRepository, schema_columns
+from app.repositories.room_inventory import RoomInventoryRepository, booking_changes
+from app.schemas.bookings import Booking, BookingAdd
 
 
 class BookingsRepository(BaseRepository):
     model = BookingsOrm
-    schema = Booking
\ No newline at end of file
+    schema = Booking
+
+    async def add_booking(self, data: BookingAdd) -> Booking:
+        """
+        Создает бронирование, только если у номера остались свободные места на период.
+
+        Строка номера должна быть заблокирована в текущей транзакции
+        (RoomsRepository.get_room(for_update=True)), иначе проверка не защищает от гонок.
+
+        Args:
+            data: данные бронирования.
+
+        Returns:
+            Созданное бронирование.
+
+        Raises:
+            AllRoomsAreBookedException: если свободных мест на период нет.
+        """
+        # Наибольшая занятость номера за дни периода: чтение диапазона первичного ключа
+        # room_inventory (room_id, day), а не поиск пересечений по всем бронированиям.
+        booked = (
+            select(func.coalesce(func.max(RoomInventoryOrm.booked_count), 0))
+            .filter(
+                RoomInventoryOrm.room_id == data.room_id,
+                RoomInventoryOrm.day >= data.date_from,
+                RoomInventoryOrm.day < data.date_to,
+            )
+            .scalar_subquery()
+        )
+        # Условный INSERT ... SELECT: строка вставляется, только если quantity больше
+        # занятости в самый загруженный день. Проверка и вставка — один запрос.
+        values = data.model_dump()
+        rows_to_insert = (
+            select(*(literal(value).label(column) for column, value in values.items()))
+            .select_from(RoomsOrm)
+            .filter(RoomsOrm.id == data.room_id, RoomsOrm.quantity > booked)
+        )
+        inserted = (
+            insert(BookingsOrm)
+            .from_select(list(values), rows_to_insert)
+            .returning(*schema_columns(self.model, self.schema))
+            .cte("inserted")
+        )
+        # Инвентарь обновляется тем же выражением: дни вставленной строки берутся
+        # из RETURNING, без повторного чтения bookings. Нет вставки — нет и изменений инвентаря.
+        inventory = self.inventory.apply_stmt(inserted).cte("inventory")
+        add_booking_stmt = select(inserted).add_cte(inventory)
+        result = await self.session.execute(add_booking_stmt)
+        row = result.one_or_none()
+        if row is None:
+            raise AllRoomsAreBookedException
+        return self.schema.model_validate(row._asdict())
+
+    async def add(self, data: BookingAdd) -> Booking:
+        """
+        Добавляет бронирование (без проверки остатка мест) и учитывает его в инвентаре.
+
+        Args:
+            data: данные бронирования.
+
+        Returns:
+            Созданное бронирование.
+        """
+        # Как в add_booking: дни для инвентаря берутся из RETURNING вставки, одним выражением.
+        inserted = (
+            insert(self.model)
+            .values(**data.model_dump())
+            .returning(*schema_columns(self.model, self.schema))
+            .cte("inserted")
+        )
+        inventory = self.inventory.apply_stmt(inserted).cte("inventory")
+        result = await self.session.execute(select(inserted).add_cte(inventory))
+        self.mark_changed()
+        return self.schema.model_validate(result.one()._asdict())
+
+    async def add_bulk(self, data: Sequence[BookingAdd]) -> list[int]:
+        """
+        Добавляет много бронирований за один запрос (без проверки остатка мест) и учитывает их в инвентаре.
+
+        Args:
+            data: список бронирований.
+
+        Returns:
+            Список id созданных бронирований в порядке входных данных.
+        """
+        ids = await super().add_bulk(data)
+        if ids:
+            # Массив id — один параметр запроса: IN (...) с десятками тысяч id уперся бы
+            # в лимит asyncpg на 32767 параметров.
+            await self.inventory.apply_bookings(
+                BookingsOrm.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+            )
+        return ids
+
+    async def edit(self, data: SH_BaseModel, exclude_unset: bool = False, **filter_by) -> None:
+        """
+        Изменяет бронирования и переносит их дни в инвентаре тем же выражением.
+
+        Args:
+            data: новые значения полей.
+            exclude_unset: обновлять только поля, переданные явно.
+            **filter_by: условия выбора бронирований.
+        """
+        # Старые периоды читаются с блокировкой строк и возвращаются из UPDATE ... FROM old
+        # вместе с новыми: из инвентаря вычитаются старые дни и добавляются новые.
+        old = (
+            select(self.model.id, self.model.room_id, self.model.date_from, self.model.date_to)
+            .filter_by(**filter_by)
+            .with_for_update()
+            .cte("old")
+        )
+        updated = (
+            update(self.model)
+            .where(self.model.id == old.c.id)
+            .values(data.model_dump(exclude_unset=exclude_unset))
+            .returning(
+                self.model.room_id,
+                self.model.date_from,
+                self.model.date_to,
+                old.c.room_id.label("old_room_id"),
+                old.c.date_from.label("old_date_from"),
+                old.c.date_to.label("old_date_to"),
+            )
+            .cte("updated")
+        )
+        removed = select(
+            updated.c.old_room_id.label("room_id"),
+            updated.c.old_date_from.label("date_from"),
+            updated.c.old_date_to.label("date_to"),
+        ).subquery("removed")
+        changes = booking_changes(removed, updated)
+        await self.session.execute(self.inventory.apply_stmt(changes).add_cte(updated))
+        self.mark_changed()
+
+    async def delete(self, **filter_by) -> None:
+        # WITH deleted AS (DELETE ... RETURNING) INSERT INTO room_inventory ...: из инвентаря
+        # вычитаются ровно те строки, которые удалил этот запрос, — одним выражением.
+        deleted = (
+            delete(self.model)
+            .filter_by(**filter_by)
+            .returning(self.model.room_id, self.model.date_from, self.model.date_to)
+            .cte("deleted")
+        )
+        # add_cte выносит WITH на верхний уровень: изменяющий CTE нельзя вложить в SELECT.
+        await self.session.execute(self.inventory.apply_stmt(deleted, sign=-1).add_cte(deleted))
+        self.mark_changed()
+
+    @cached_property
+    def inventory(self) -> RoomInventoryRepository:
+        return RoomInventoryRepository(self.session)
\ No newline at end of file
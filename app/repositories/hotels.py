@@ -1,13 +1,19 @@
+from datetime import date
 from typing import List
 from sqlalchemy import select, func
-from app.schemas.hotels import Hotel
-from repositories.base import BaseRepository
+from sqlalchemy.orm import selectinload
+from app.schemas.hotels import Hotel, HotelWithRooms, HotelWithRoomsAvailability
+from app.schemas.rooms import RoomWithAvailability
+from app.repositories.base import BaseRepository, schema_columns
 from app.models.hotels import HotelsOrm
+from app.models.rooms import RoomsOrm
+from app.repositories.utils import rooms_ids_for_booking, rooms_left_table
 
 
 class HotelsRepository(BaseRepository):
     model = HotelsOrm
     schema = Hotel
+    cache_namespace = "hotels"
 
     # специфический для отелей метод прописываем здесь, а не в base.py:
     async def get_all(
@@ -16,20 +22,125 @@ class HotelsRepository(BaseRepository):
             title,
             limit,
             offset,
-    ) -> List[Hotel]:
-        
-        query = select(HotelsOrm)
+            date_from: date | None = None,
+            date_to: date | None = None,
+            after_id: int | None = None,
+            rank_by_similarity: bool = False,
+            with_rooms: bool = False,
+    ) -> List[Hotel] | List[HotelWithRooms]:
+        """
+        Возвращает отели по фильтрам с пагинацией.
+
+        Args:
+            location: подстрока адреса.
+            title: подстрока названия.
+            limit: размер страницы.
+            offset: смещение (используется, если after_id не задан).
+            date_from: дата заезда для фильтра по свободным номерам.
+            date_to: дата выезда для фильтра по свободным номерам.
+            after_id: id последнего отеля предыдущей страницы (keyset-пагинация).
+            rank_by_similarity: сортировать по триграммной похожести на строки поиска
+                (несовместимо с after_id — ранжированная выдача листается через offset).
+            with_rooms: загрузить номера отелей (одним дополнительным запросом на всю страницу).
+
+        Returns:
+            Список отелей (с номерами, если with_rooms).
+        """
+        # Номера подгружаются через relationship, поэтому с with_rooms нужны ORM-объекты;
+        # без него выбираем столбцы (Core) и не наполняем identity map сессии.
+        query = select(HotelsOrm) if with_rooms else select(*schema_columns(HotelsOrm, Hotel))
+        # ILIKE по самому столбцу обслуживается триграммным GIN-индексом (pg_trgm),
+        # в отличие от lower(col) LIKE, который всегда приводит к полному сканированию.
+        # autoescape экранирует % и _ из пользовательского ввода.
+        similarity = []
         if location:
-            query = query.filter(func.lower(HotelsOrm.location).contains(location.strip().lower()))
+            location = location.strip()
+            query = query.filter(HotelsOrm.location.icontains(location, autoescape=True))
+            similarity.append(func.word_similarity(location, HotelsOrm.location))
         if title:
-            query = query.filter(func.lower(HotelsOrm.title).contains(title.strip().lower()))
+            title = title.strip()
+            query = query.filter(HotelsOrm.title.icontains(title, autoescape=True))
+            similarity.append(func.word_similarity(title, HotelsOrm.title))
+        # Оставляем только отели, где есть хотя бы один номер со свободным местом на период.
+        # Подзапрос выполняется в том же SQL-запросе, без отдельного обращения к БД.
+        if date_from is not None and date_to is not None:
+            hotels_ids_to_get = (
+                select(RoomsOrm.hotel_id)
+                .filter(RoomsOrm.id.in_(rooms_ids_for_booking(date_from, date_to)))
+            )
+            query = query.filter(HotelsOrm.id.in_(hotels_ids_to_get))
+        # Keyset-пагинация: продолжаем с места, где закончилась прошлая страница,
+        # вместо того чтобы сканировать и отбрасывать offset строк.
+        if rank_by_similarity and similarity:
+            # Самые похожие отели первыми; id — для стабильного порядка при равной похожести.
+            query = query.order_by(sum(similarity[1:], similarity[0]).desc(), HotelsOrm.id)
+        else:
+            if after_id is not None:
+                query = query.filter(HotelsOrm.id > after_id)
+                offset = 0
+            query = query.order_by(HotelsOrm.id)
         query = (
             query
             .limit(limit)
             .offset(offset)
         )
-        # эта строка позволяет увидеть в терминале реальный SQL-запрос который алхимия отправляет в БД. Это полезно для дебага:
-        print(query.compile(compile_kwargs={"literal_binds": True}))  # 4DEBUG
+        # selectinload подгружает номера всех отелей страницы одним запросом WHERE hotel_id IN (...),
+        # поэтому страница из N отелей — это два запроса, а не N+1.
+        if with_rooms:
+            query = query.options(selectinload(HotelsOrm.rooms))
+        result = await self.session.execute(query)
+
+        if not with_rooms:
+            return self.validate_rows(result.keys(), result.all())
+        return [HotelWithRooms.model_validate(hotel) for hotel in result.scalars().all()]
+
+    async def get_one_with_rooms(self, **filter_by) -> HotelWithRooms | None:
+        """
+        Возвращает отель вместе с его номерами.
+
+        Args:
+            **filter_by: параметры фильтрации для поиска отеля.
+
+        Returns:
+            Отель с номерами или None, если отель не найден.
+        """
+        query = select(HotelsOrm).filter_by(**filter_by).options(selectinload(HotelsOrm.rooms))
         result = await self.session.execute(query)
+        model = result.scalars().one_or_none()
+        if model is None:
+            return None
+        return HotelWithRooms.model_validate(model)
+
+    async def add_rooms_availability(
+            self,
+            hotels: List[HotelWithRooms],
+            date_from: date,
+            date_to: date,
+    ) -> List[HotelWithRoomsAvailability]:
+        """
+        Добавляет к номерам отелей остаток свободных мест на период.
+
+        Args:
+            hotels: отели с уже загруженными номерами.
+            date_from: дата заезда.
+            date_to: дата выезда.
 
-        return [Hotel.model_validate(hotel) for hotel in result.scalars().all()]
\ No newline at end of file
+        Returns:
+            Отели с номерами, у каждого номера есть поле rooms_left.
+        """
+        if not hotels:
+            return []
+        # Остатки по номерам всех отелей считаются одним агрегирующим запросом.
+        rooms_left = rooms_left_table(date_from, date_to, hotels_ids=[hotel.id for hotel in hotels])
+        result = await self.session.execute(select(rooms_left.c.room_id, rooms_left.c.rooms_left))
+        rooms_left_by_id = dict(result.tuples().all())
+        return [
+            HotelWithRoomsAvailability(
+                **hotel.model_dump(exclude={"rooms"}),
+                rooms=[
+                    RoomWithAvailability(**room.model_dump(), rooms_left=rooms_left_by_id.get(room.id, room.quantity))
+                    for room in hotel.rooms
+                ],
+            )
+            for hotel in hotels
+        ]
\ No newline at end of file
@@ -0,0 +1,96 @@
+# app/repositories/idempotency_keys.py
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.idempotency_keys import IdempotencyKeysOrm
+from app.repositories.base import BaseRepository
+from app.schemas.idempotency_keys import IdempotencyKey
+
+
+class IdempotencyKeysRepository(BaseRepository):
+    model = IdempotencyKeysOrm
+    schema = IdempotencyKey
+
+    async def get_key(self, user_id: int, key: str, ttl: timedelta) -> IdempotencyKey | None:
+        """
+        Ищет действующий ключ идемпотентности пользователя (поиск по первичному ключу).
+
+        Args:
+            user_id: идентификатор пользователя.
+            key: значение заголовка Idempotency-Key.
+            ttl: срок жизни ключа.
+
+        Returns:
+            Запись ключа или None, если ключ не использовался или истек.
+        """
+        # Истекший ключ не повторяется, даже если очистка по cron его еще не удалила.
+        query = (
+            select(self.model)
+            .filter_by(user_id=user_id, key=key)
+            .filter(self.model.created_at > func.now() - ttl)
+        )
+        result = await self.session.execute(query)
+        model = result.scalars().one_or_none()
+        if model is None:
+            return None
+        return self.schema.model_validate(model)
+
+    async def reserve(self, user_id: int, key: str, request_hash: str, ttl: timedelta) -> bool:
+        """
+        Занимает ключ идемпотентности в текущей транзакции.
+
+        Параллельный запрос с тем же ключом ждет на уникальном индексе, пока эта
+        транзакция не завершится: после COMMIT он найдет готовый ответ, после ROLLBACK
+        займет ключ сам.
+
+        Args:
+            user_id: идентификатор пользователя.
+            key: значение заголовка Idempotency-Key.
+            request_hash: хэш тела запроса.
+            ttl: срок жизни ключа.
+
+        Returns:
+            True, если ключ занят этим запросом; False, если он уже был сохранен и не истек.
+        """
+        stmt = insert(self.model).values(user_id=user_id, key=key, request_hash=request_hash)
+        # Истекшая, но еще не удаленная запись занимается заново, как будто ключа не было.
+        reserve_stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.user_id, self.model.key],
+            set_={"request_hash": stmt.excluded.request_hash, "response": None, "created_at": func.now()},
+            where=self.model.created_at <= func.now() - ttl,
+        ).returning(self.model.key)
+        result = await self.session.execute(reserve_stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def save_response(self, user_id: int, key: str, response: dict) -> None:
+        """
+        Сохраняет ответ запроса для занятого ключа.
+
+        Args:
+            user_id: идентификатор пользователя.
+            key: значение заголовка Idempotency-Key.
+            response: JSON-совместимое тело ответа.
+        """
+        save_stmt = (
+            update(self.model)
+            .filter_by(user_id=user_id, key=key)
+            .values(response=response)
+        )
+        await self.session.execute(save_stmt)
+
+    async def delete_expired(self, created_before: datetime) -> int:
+        """
+        Удаляет ключи, созданные раньше указанного момента.
+
+        Args:
+            created_before: граница по времени создания.
+
+        Returns:
+            Число удаленных ключей.
+        """
+        delete_stmt = delete(self.model).filter(self.model.created_at < created_before)
+        result = await self.session.execute(delete_stmt)
+        return result.rowcount
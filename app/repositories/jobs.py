@@ -0,0 +1,91 @@
+# app/repositories/jobs.py
+
+from datetime import timedelta
+
+from sqlalchemy import delete, func, insert, select, update
+
+from app.models.jobs import JobsOrm
+from app.repositories.base import BaseRepository, schema_columns
+from app.schemas.jobs import Job, JobAdd
+
+
+class JobsRepository(BaseRepository):
+    model = JobsOrm
+    schema = Job
+
+    async def add_job(self, data: JobAdd) -> None:
+        """
+        Записывает задачу в очередь в текущей транзакции.
+
+        Задача станет видна воркерам только после COMMIT, поэтому она не выполнится
+        для данных, которые откатились.
+
+        Args:
+            data: имя задачи и ее параметры.
+        """
+        await self.session.execute(insert(self.model).values(**data.model_dump()))
+
+    async def claim(self, lease_seconds: float) -> Job | None:
+        """
+        Забирает одну готовую к выполнению задачу, сдвигая ее run_at на время аренды.
+
+        SKIP LOCKED: задачи, которые в этот момент забирают другие воркеры (и процессы),
+        пропускаются без ожидания. После COMMIT задача не видна другим воркерам до конца
+        аренды, поэтому обработчик выполняется вне транзакции; если воркер упал,
+        задача снова станет доступной, когда аренда истечет.
+
+        Args:
+            lease_seconds: на сколько секунд задача закрепляется за воркером.
+
+        Returns:
+            Задача (attempts — номер текущей попытки) или None, если готовых задач нет.
+        """
+        candidate = (
+            select(self.model.id)
+            .filter(self.model.failed_at.is_(None), self.model.run_at <= func.now())
+            .order_by(self.model.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        # Попытка засчитывается при захвате: задача, роняющая процесс, тоже исчерпает попытки.
+        claim_stmt = (
+            update(self.model)
+            .filter(self.model.id == candidate)
+            .values(run_at=func.now() + timedelta(seconds=lease_seconds), attempts=self.model.attempts + 1)
+            .returning(*schema_columns(self.model, self.schema))
+            # Строки возвращаются кортежами Core: синхронизировать identity map сессии нечего.
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(claim_stmt)
+        rows = self.validate_rows(result.keys(), result.all())
+        return rows[0] if rows else None
+
+    async def complete(self, job: Job) -> None:
+        """Удаляет выполненную задачу."""
+        # Фильтр по attempts: результат не записывается, если задачу уже забрали заново
+        # (аренда истекла, и другой воркер начал следующую попытку). То же в retry и fail.
+        await self.session.execute(delete(self.model).filter_by(id=job.id, attempts=job.attempts))
+
+    async def retry(self, job: Job, delay_seconds: float, error: str) -> None:
+        """
+        Откладывает задачу для повторной попытки.
+
+        Args:
+            job: задача из claim().
+            delay_seconds: через сколько секунд повторить.
+            error: текст ошибки последней попытки.
+        """
+        await self.session.execute(
+            update(self.model)
+            .filter_by(id=job.id, attempts=job.attempts)
+            .values(run_at=func.now() + timedelta(seconds=delay_seconds), last_error=error)
+        )
+
+    async def fail(self, job: Job, error: str) -> None:
+        """Помечает задачу проваленной после последней попытки."""
+        await self.session.execute(
+            update(self.model)
+            .filter_by(id=job.id, attempts=job.attempts)
+            .values(failed_at=func.now(), last_error=error)
+        )
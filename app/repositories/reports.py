@@ -0,0 +1,178 @@
+# app/repositories/reports.py
+
+from datetime import date, timedelta
+
+from sqlalchemy import Date, Float, Integer, cast, column, func, literal, select, table, text
+
+from app.models.bookings import BookingsOrm
+from app.models.room_inventory import RoomInventoryOrm
+from app.models.rooms import RoomsOrm
+from app.schemas.reports import HotelMonthRevenue, RoomDayOccupancy, TopRoom
+
+# Материализованное представление из миграции e6359e1ad35e (не ORM-модель,
+# чтобы autogenerate не пытался создать его как таблицу).
+hotel_revenue_monthly = table(
+    "hotel_revenue_monthly",
+    column("hotel_id", Integer),
+    column("month", Date),
+    column("revenue", Integer),
+    column("bookings_count", Integer),
+)
+
+
+class ReportsRepository:
+    """Агрегирующие отчеты по бронированиям; все вычисления выполняются в БД через GROUP BY."""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def get_revenue_by_month(
+            self,
+            date_from: date,
+            date_to: date,
+            hotel_id: int | None = None,
+            from_view: bool = False,
+    ) -> list[HotelMonthRevenue]:
+        """
+        Возвращает выручку по отелям и месяцам (месяц — по дате заезда).
+
+        Отчет помесячный: период расширяется до целых месяцев — от месяца date_from
+        до месяца последнего дня периода включительно. Так оба источника (живой расчет
+        и представление) считают одну и ту же выручку.
+
+        Args:
+            date_from: начало периода (по дате заезда).
+            date_to: конец периода (не включительно).
+            hotel_id: идентификатор отеля (если None — по всем отелям).
+            from_view: читать из материализованного представления hotel_revenue_monthly.
+
+        Returns:
+            Список строк отчета, отсортированный по отелю и месяцу.
+        """
+        # Границы целых месяцев: [первый день месяца date_from, первый день месяца после date_to - 1 день).
+        month_from = date_from.replace(day=1)
+        last_month = (date_to - timedelta(days=1)).replace(day=1)
+        month_to = (last_month + timedelta(days=32)).replace(day=1)
+        if from_view:
+            # Готовые агрегаты по месяцам.
+            mv = hotel_revenue_monthly
+            query = select(mv.c.hotel_id, mv.c.month, mv.c.revenue, mv.c.bookings_count).filter(
+                mv.c.month >= month_from,
+                mv.c.month < month_to,
+            )
+            if hotel_id is not None:
+                query = query.filter(mv.c.hotel_id == hotel_id)
+            query = query.order_by(mv.c.hotel_id, mv.c.month)
+        else:
+            # Живой расчет: стоимость считается SQL-выражением гибридного свойства total_cost.
+            month = func.date_trunc("month", BookingsOrm.date_from).cast(Date)
+            query = (
+                select(
+                    RoomsOrm.hotel_id.label("hotel_id"),
+                    month.label("month"),
+                    func.sum(BookingsOrm.total_cost).label("revenue"),
+                    func.count().label("bookings_count"),
+                )
+                .select_from(BookingsOrm)
+                .join(RoomsOrm, RoomsOrm.id == BookingsOrm.room_id)
+                .filter(BookingsOrm.date_from >= month_from, BookingsOrm.date_from < month_to)
+            )
+            if hotel_id is not None:
+                query = query.filter(RoomsOrm.hotel_id == hotel_id)
+            query = query.group_by(RoomsOrm.hotel_id, month).order_by(RoomsOrm.hotel_id, month)
+        result = await self.session.execute(query)
+        return [HotelMonthRevenue.model_validate(row, from_attributes=True) for row in result.all()]
+
+    async def get_occupancy_by_day(
+            self,
+            hotel_id: int,
+            date_from: date,
+            date_to: date,
+    ) -> list[RoomDayOccupancy]:
+        """
+        Возвращает загрузку каждого номера отеля по дням.
+
+        Args:
+            hotel_id: идентификатор отеля.
+            date_from: первый день периода.
+            date_to: день после последнего дня периода.
+
+        Returns:
+            Строки (номер, день, занято, всего, доля занятости).
+        """
+        # Ряд дней периода строит сама БД (generate_series), без цикла в Python.
+        days = (
+            select(
+                func.generate_series(date_from, date_to - timedelta(days=1), text("interval '1 day'"))
+                .cast(Date)
+                .label("day")
+            )
+            .subquery("days")
+        )
+        # Занятость по дням берется из room_inventory: одна строка на номер и день,
+        # поиск по первичному ключу вместо перебора бронирований для каждого дня.
+        booked = func.coalesce(RoomInventoryOrm.booked_count, 0)
+        query = (
+            select(
+                RoomsOrm.id.label("room_id"),
+                days.c.day,
+                booked.label("booked"),
+                RoomsOrm.quantity.label("quantity"),
+                # Доля занятых мест; для номера с quantity = 0 считаем загрузку нулевой.
+                func.coalesce(cast(booked, Float) / func.nullif(RoomsOrm.quantity, 0), 0.0).label("occupancy_rate"),
+            )
+            .select_from(RoomsOrm)
+            .join(days, literal(True))
+            .outerjoin(
+                RoomInventoryOrm,
+                (RoomInventoryOrm.room_id == RoomsOrm.id) & (RoomInventoryOrm.day == days.c.day),
+            )
+            .filter(RoomsOrm.hotel_id == hotel_id)
+            .order_by(RoomsOrm.id, days.c.day)
+        )
+        result = await self.session.execute(query)
+        return [RoomDayOccupancy.model_validate(row, from_attributes=True) for row in result.all()]
+
+    async def get_top_rooms(
+            self,
+            date_from: date,
+            date_to: date,
+            limit: int,
+    ) -> list[TopRoom]:
+        """
+        Возвращает номера с наибольшей выручкой за период (по дате заезда).
+
+        Args:
+            date_from: начало периода.
+            date_to: конец периода (не включительно).
+            limit: сколько номеров вернуть.
+
+        Returns:
+            Номера, отсортированные по убыванию выручки.
+        """
+        revenue = func.sum(BookingsOrm.total_cost)
+        query = (
+            select(
+                RoomsOrm.id.label("room_id"),
+                RoomsOrm.hotel_id,
+                RoomsOrm.title,
+                revenue.label("revenue"),
+                func.count().label("bookings_count"),
+            )
+            .select_from(BookingsOrm)
+            .join(RoomsOrm, RoomsOrm.id == BookingsOrm.room_id)
+            .filter(BookingsOrm.date_from >= date_from, BookingsOrm.date_from < date_to)
+            .group_by(RoomsOrm.id)
+            .order_by(revenue.desc(), RoomsOrm.id)
+            .limit(limit)
+        )
+        result = await self.session.execute(query)
+        return [TopRoom.model_validate(row, from_attributes=True) for row in result.all()]
+
+    async def refresh_revenue_view(self) -> None:
+        """
+        Пересчитывает материализованное представление hotel_revenue_monthly.
+
+        CONCURRENTLY не блокирует чтение отчета на время пересчета.
+        """
+        await self.session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY hotel_revenue_monthly"))
@@ -0,0 +1,218 @@
+# app/repositories/room_inventory.py
+
+from datetime import date, timedelta
+
+from sqlalchemy import Date, delete, func, literal, literal_column, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.bookings import BookingsOrm
+from app.models.room_inventory import RoomInventoryOrm
+from app.models.rooms import RoomsOrm
+from app.repositories.base import BaseRepository
+from app.schemas.room_inventory import RoomDayAvailability, RoomInventory
+
+
+def booked_days(bookings, sign: int = 1):
+    """
+    Формирует выборку занятости номеров по дням для набора бронирований.
+
+    Args:
+        bookings: выборка бронирований со столбцами room_id, date_from, date_to
+            и, при необходимости, sign — знаком каждой строки (см. booking_changes).
+        sign: 1 — бронирования добавляются, -1 — удаляются (если в выборке нет столбца sign).
+
+    Returns:
+        SELECT со столбцами room_id, day, booked_count (с учетом знака).
+    """
+    weight = bookings.c.sign if "sign" in bookings.c else literal(sign)
+    # Каждое бронирование разворачивается в дни проживания [date_from, date_to) прямо в БД.
+    nights = (
+        select(
+            bookings.c.room_id,
+            func.generate_series(
+                bookings.c.date_from,
+                bookings.c.date_to - literal_column("1"),
+                text("interval '1 day'"),
+            ).cast(Date).label("day"),
+            weight.label("sign"),
+        )
+        .subquery("nights")
+    )
+    # Порядок (room_id, day) одинаков у всех транзакций: параллельные вставки
+    # блокируют строки инвентаря в одном порядке и не ловят взаимоблокировку.
+    return (
+        select(nights.c.room_id, nights.c.day, func.sum(nights.c.sign).label("booked_count"))
+        .group_by(nights.c.room_id, nights.c.day)
+        .order_by(nights.c.room_id, nights.c.day)
+    )
+
+
+def booking_changes(removed, added):
+    """
+    Объединяет удаленные и добавленные периоды бронирований в одну выборку со знаком.
+
+    Один день номера может встретиться и среди удаленных, и среди добавленных дней,
+    а upsert не может изменить одну строку инвентаря дважды за запрос — поэтому
+    дельты складываются до upsert (см. booked_days).
+
+    Args:
+        removed: выборка снятых периодов (room_id, date_from, date_to).
+        added: выборка новых периодов (room_id, date_from, date_to).
+
+    Returns:
+        Подзапрос со столбцами room_id, date_from, date_to, sign.
+    """
+    return union_all(
+        select(removed.c.room_id, removed.c.date_from, removed.c.date_to, literal(-1).label("sign")),
+        select(added.c.room_id, added.c.date_from, added.c.date_to, literal(1).label("sign")),
+    ).subquery("changes")
+
+
+def bookings_where(*criteria):
+    """
+    Выборка периодов бронирований, подходящих под условия (все бронирования, если условий нет).
+
+    Args:
+        *criteria: условия на BookingsOrm.
+
+    Returns:
+        Подзапрос со столбцами room_id, date_from, date_to.
+    """
+    return (
+        select(BookingsOrm.room_id, BookingsOrm.date_from, BookingsOrm.date_to)
+        .filter(*criteria)
+        .subquery("bookings")
+    )
+
+
+class RoomInventoryRepository(BaseRepository):
+    model = RoomInventoryOrm
+    schema = RoomInventory
+
+    def apply_stmt(self, bookings, sign: int = 1):
+        """
+        Формирует upsert, сдвигающий занятость номеров по дням на набор бронирований.
+
+        Args:
+            bookings: выборка бронирований со столбцами room_id, date_from, date_to.
+            sign: 1 — бронирования добавлены, -1 — удалены.
+
+        Returns:
+            INSERT ... ON CONFLICT DO UPDATE по room_inventory.
+        """
+        stmt = insert(self.model).from_select(["room_id", "day", "booked_count"], booked_days(bookings, sign))
+        # Дня еще нет — строка создается, есть — счетчик сдвигается на дельту.
+        return stmt.on_conflict_do_update(
+            index_elements=[self.model.room_id, self.model.day],
+            set_={"booked_count": self.model.booked_count + stmt.excluded.booked_count},
+        )
+
+    async def apply_bookings(self, *criteria) -> None:
+        """
+        Учитывает в инвентаре уже вставленные бронирования.
+
+        Вызывается в той же транзакции, что и вставка, поэтому инвентарь
+        и таблица bookings фиксируются вместе.
+
+        Args:
+            *criteria: условия на BookingsOrm, выбирающие добавленные бронирования.
+        """
+        await self.session.execute(self.apply_stmt(bookings_where(*criteria)))
+
+    async def rebuild(self, rooms_ids: list[int] | None = None) -> None:
+        """
+        Пересчитывает инвентарь из таблицы bookings (первичное заполнение или исправление).
+
+        Args:
+            rooms_ids: номера, для которых пересчитать инвентарь (если None — все).
+        """
+        # SHARE-блокировка не дает добавлять и удалять бронирования до конца транзакции:
+        # иначе бронирование, вставленное во время пересчета, потерялось бы в инвентаре.
+        await self.session.execute(text("LOCK TABLE bookings IN SHARE MODE"))
+        criteria = [] if rooms_ids is None else [BookingsOrm.room_id.in_(rooms_ids)]
+        # Пустые дни (booked_count = 0), оставшиеся после отмен, при пересчете исчезают.
+        delete_stmt = delete(self.model)
+        if rooms_ids is not None:
+            delete_stmt = delete_stmt.filter(self.model.room_id.in_(rooms_ids))
+        await self.session.execute(delete_stmt)
+        await self.session.execute(
+            insert(self.model).from_select(["room_id", "day", "booked_count"], booked_days(bookings_where(*criteria)))
+        )
+
+    async def find_mismatches(self, rooms_ids: list[int] | None = None) -> list[tuple[int, date, int, int]]:
+        """
+        Сверяет инвентарь с таблицей bookings.
+
+        Args:
+            rooms_ids: номера, которые сверить (если None — все).
+
+        Returns:
+            Строки (room_id, day, в инвентаре, по бронированиям) для расходящихся дней.
+        """
+        criteria = [] if rooms_ids is None else [BookingsOrm.room_id.in_(rooms_ids)]
+        expected = booked_days(bookings_where(*criteria)).order_by(None).subquery("expected")
+        stored = select(self.model).filter(self.model.booked_count != 0)
+        if rooms_ids is not None:
+            stored = stored.filter(self.model.room_id.in_(rooms_ids))
+        stored = stored.subquery("stored")
+        # FULL JOIN: день может быть лишним в инвентаре или отсутствовать в нем.
+        stored_count = func.coalesce(stored.c.booked_count, 0)
+        expected_count = func.coalesce(expected.c.booked_count, 0)
+        query = (
+            select(
+                func.coalesce(stored.c.room_id, expected.c.room_id).label("room_id"),
+                func.coalesce(stored.c.day, expected.c.day).label("day"),
+                stored_count.label("stored"),
+                expected_count.label("expected"),
+            )
+            .select_from(stored)
+            .join(
+                expected,
+                (stored.c.room_id == expected.c.room_id) & (stored.c.day == expected.c.day),
+                full=True,
+            )
+            .filter(stored_count != expected_count)
+            .order_by("room_id", "day")
+        )
+        result = await self.session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def get_calendar(
+            self,
+            hotel_id: int,
+            room_id: int,
+            date_from: date,
+            date_to: date,
+    ) -> list[RoomDayAvailability]:
+        """
+        Возвращает занятость и остаток мест номера по каждому дню периода.
+
+        Args:
+            hotel_id: идентификатор отеля.
+            room_id: идентификатор номера.
+            date_from: первый день периода.
+            date_to: день после последнего дня периода.
+
+        Returns:
+            Строки (день, занято, осталось) по порядку дней; пустой список, если номера нет в отеле.
+        """
+        days = (
+            select(
+                func.generate_series(date_from, date_to - timedelta(days=1), text("interval '1 day'"))
+                .cast(Date)
+                .label("day")
+            )
+            .subquery("days")
+        )
+        # Дни без строки в инвентаре свободны; сама выборка — чтение диапазона первичного ключа.
+        booked = func.coalesce(self.model.booked_count, 0)
+        query = (
+            select(days.c.day, booked.label("booked"), (RoomsOrm.quantity - booked).label("rooms_left"))
+            .select_from(RoomsOrm)
+            .join(days, literal(True))
+            .outerjoin(self.model, (self.model.room_id == RoomsOrm.id) & (self.model.day == days.c.day))
+            .filter(RoomsOrm.id == room_id, RoomsOrm.hotel_id == hotel_id)
+            .order_by(days.c.day)
+        )
+        result = await self.session.execute(query)
+        return self.validate_rows(result.keys(), result.all(), schema=RoomDayAvailability)
@@ -1,5 +1,8 @@
-from repositories.base import BaseRepository
+from datetime import date
+
+from app.repositories.base import BaseRepository, schema_columns
 from app.models.rooms import RoomsOrm
+from app.repositories.utils import rooms_ids_for_booking
 from app.schemas.rooms import Room
 from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
@@ -8,13 +11,15 @@ from sqlalchemy.exc import NoResultFound
 class RoomsRepository(BaseRepository):
     model = RoomsOrm
     schema: type[Room] = Room
+    cache_namespace = "rooms"
 
     # определим отдельный метод для номеров, иначе линтер ругается в api/booking.py
-    async def get_room(self, **filter_by) -> Room:
+    async def get_room(self, for_update: bool = False, **filter_by) -> Room:
         """
         Возвращает номер по фильтрам или выбрасывает ошибку, если он не найден.
 
         Args:
+            for_update: заблокировать строку номера (SELECT ... FOR UPDATE) до конца транзакции.
             **filter_by: параметры фильтрации для поиска номера.
 
         Returns:
@@ -23,9 +28,34 @@ class RoomsRepository(BaseRepository):
         Raises:
             NoResultFound: если номер не найден.
         """
-        # Формируем запрос на поиск номера по переданным фильтрам.
-        query = select(self.model).filter_by(**filter_by)
+        # Берем готовый запрос на поиск номера по переданным фильтрам.
+        # С for_update блокируется только строка этого номера: конкурирующие бронирования
+        # того же номера ждут коммита, остальные номера и таблица бронирований не блокируются.
+        query, params = self.lookup(filter_by, for_update=for_update)
+        result = await self.session.execute(query, params)
+        row = result.one()
+        # Строим Pydantic-схему прямо из строки, без ORM-объекта.
+        return self.schema.model_validate(row._asdict())
+
+    async def get_filtered_by_time(
+            self,
+            hotel_id: int,
+            date_from: date,
+            date_to: date,
+    ) -> list[Room]:
+        """
+        Возвращает номера отеля, в которых есть свободные места на период.
+
+        Args:
+            hotel_id: идентификатор отеля.
+            date_from: дата заезда.
+            date_to: дата выезда.
+
+        Returns:
+            Список номеров со свободными местами.
+        """
+        # Остатки считаются в БД одним запросом (CTE + GROUP BY), без выгрузки бронирований.
+        rooms_ids_to_get = rooms_ids_for_booking(date_from, date_to, hotel_id=hotel_id)
+        query = select(*schema_columns(self.model, self.schema)).filter(self.model.id.in_(rooms_ids_to_get))
         result = await self.session.execute(query)
-        model = result.scalars().one()
-        # Преобразуем ORM-объект в Pydantic-схему.
-        return self.schema.model_validate(model)
+        return self.validate_rows(result.keys(), result.all())
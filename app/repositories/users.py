@@ -1,7 +1,6 @@
 
 from pydantic import EmailStr
-from sqlalchemy import select
-from repositories.base import BaseRepository
+from app.repositories.base import BaseRepository
 from app.models.users import UsersOrm
 from app.schemas.users import User, UserWithHashedPassword
 
@@ -11,7 +10,6 @@ class UsersRepository(BaseRepository):
     schema = User
 
     async def get_user_with_hashed_password(self, email: EmailStr):
-        query = select(self.model).filter_by(email=email)
-        result = await self.session.execute(query)
-        model = result.scalars().one()
-        return UserWithHashedPassword.model_validate(model)
\ No newline at end of file
+        query, params = self.lookup({"email": email}, schema=UserWithHashedPassword)
+        result = await self.session.execute(query, params)
+        return UserWithHashedPassword.model_validate(result.one()._asdict())
\ No newline at end of file
@@ -0,0 +1,84 @@
+# app/repositories/utils.py
+
+from datetime import date
+
+from sqlalchemy import select, func
+
+from app.models.room_inventory import RoomInventoryOrm
+from app.models.rooms import RoomsOrm
+
+
+def rooms_left_table(
+        date_from: date,
+        date_to: date,
+        hotels_ids: list[int] | None = None,
+):
+    """
+    Формирует CTE с остатком свободных мест по каждому номеру на период.
+
+    Args:
+        date_from: дата заезда.
+        date_to: дата выезда.
+        hotels_ids: идентификаторы отелей (если None — по всем отелям).
+
+    Returns:
+        CTE со столбцами room_id и rooms_left.
+    """
+    # CTE 1: наибольшая занятость каждого номера за дни периода [date_from, date_to).
+    # Свободное место должно быть в каждый день проживания, поэтому решает самый загруженный день.
+    # Занятость по дням заранее посчитана в room_inventory: это чтение диапазона индекса,
+    # а не поиск пересечений по всем бронированиям.
+    rooms_count = (
+        select(RoomInventoryOrm.room_id, func.max(RoomInventoryOrm.booked_count).label("rooms_booked"))
+        .filter(RoomInventoryOrm.day >= date_from, RoomInventoryOrm.day < date_to)
+    )
+    # Для конкретных отелей читаем только дни их номеров: диапазон первичного ключа (room_id, day).
+    if hotels_ids is not None:
+        rooms_count = rooms_count.filter(
+            RoomInventoryOrm.room_id.in_(select(RoomsOrm.id).filter(RoomsOrm.hotel_id.in_(hotels_ids)))
+        )
+    rooms_count = rooms_count.group_by(RoomInventoryOrm.room_id).cte(name="rooms_count")
+
+    # CTE 2: остаток свободных мест = quantity минус занятость в самый загруженный день.
+    # LEFT JOIN нужен, чтобы номера без бронирований тоже попали в выборку (coalesce -> 0).
+    rooms_left = (
+        select(
+            RoomsOrm.id.label("room_id"),
+            (RoomsOrm.quantity - func.coalesce(rooms_count.c.rooms_booked, 0)).label("rooms_left"),
+        )
+        .select_from(RoomsOrm)
+        .outerjoin(rooms_count, RoomsOrm.id == rooms_count.c.room_id)
+    )
+    # Ограничиваем расчет нужными отелями, чтобы не считать остатки по всей таблице номеров.
+    if hotels_ids is not None:
+        rooms_left = rooms_left.filter(RoomsOrm.hotel_id.in_(hotels_ids))
+    return rooms_left.cte(name="rooms_left_table")
+
+
+def rooms_ids_for_booking(
+        date_from: date,
+        date_to: date,
+        hotel_id: int | None = None,
+):
+    """
+    Формирует запрос id номеров, у которых есть свободные места на период.
+
+    Args:
+        date_from: дата заезда.
+        date_to: дата выезда.
+        hotel_id: идентификатор отеля (если None — по всем отелям).
+
+    Returns:
+        SELECT-запрос со столбцом room_id, пригодный для подстановки в IN (...).
+    """
+    rooms_left = rooms_left_table(
+        date_from,
+        date_to,
+        hotels_ids=[hotel_id] if hotel_id is not None else None,
+    )
+    # Итог: только номера, где осталось хотя бы одно свободное место.
+    return (
+        select(rooms_left.c.room_id)
+        .select_from(rooms_left)
+        .filter(rooms_left.c.rooms_left > 0)
+    )
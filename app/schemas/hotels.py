@@ -2,6 +2,8 @@
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from app.schemas.rooms import Room, RoomWithAvailability
+
 
 class HotelAdd(BaseModel):
     title: str
@@ -14,6 +16,14 @@ class Hotel(HotelAdd):
     model_config = ConfigDict(from_attributes=True)
 
 
+class HotelWithRooms(Hotel):
+    rooms: list[Room]
+
+
+class HotelWithRoomsAvailability(Hotel):
+    rooms: list[RoomWithAvailability]
+
+
 class HotelPatch(BaseModel):
     title: str | None = Field(default=None)
     location: str | None = Field(default=None)
\ No newline at end of file
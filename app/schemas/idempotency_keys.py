@@ -0,0 +1,15 @@
+# app/schemas/idempotency_keys.py
+
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class IdempotencyKey(BaseModel):
+    user_id: int
+    key: str
+    request_hash: str
+    response: dict | None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
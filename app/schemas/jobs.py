@@ -0,0 +1,13 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class JobAdd(BaseModel):
+    name: str
+    payload: dict
+
+
+class Job(JobAdd):
+    id: int
+    attempts: int
+
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -0,0 +1,28 @@
+# app/schemas/reports.py
+
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class HotelMonthRevenue(BaseModel):
+    hotel_id: int
+    month: date
+    revenue: int
+    bookings_count: int
+
+
+class RoomDayOccupancy(BaseModel):
+    room_id: int
+    day: date
+    booked: int
+    quantity: int
+    occupancy_rate: float
+
+
+class TopRoom(BaseModel):
+    room_id: int
+    hotel_id: int
+    title: str
+    revenue: int
+    bookings_count: int
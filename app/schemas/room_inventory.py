@@ -0,0 +1,17 @@
+# app/schemas/room_inventory.py
+
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class RoomDayAvailability(BaseModel):
+    day: date
+    booked: int
+    rooms_left: int
+
+
+class RoomInventory(BaseModel):
+    room_id: int
+    day: date
+    booked_count: int
\ No newline at end of file
@@ -24,6 +24,10 @@ class Room(RoomAdd):
     model_config = ConfigDict(from_attributes=True)
 
 
+class RoomWithAvailability(Room):
+    rooms_left: int
+
+
 class RoomPatchRequest(BaseModel):
     title: str | None = None
     description: str | None = None
@@ -0,0 +1,313 @@
+# app/scripts/benchmark.py
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+import httpx
+
+from app.database import async_session_maker
+from app.schemas.bookings import BookingAdd
+from app.schemas.hotels import HotelAdd
+from app.schemas.rooms import RoomAdd
+from app.schemas.users import UserAdd
+from app.services.auth import AuthService
+from app.utils.db_manager import DBManager
+
+LOCATIONS = ["Сочи", "Дубай", "Москва", "Казань", "Анталья", "Калининград", "Минск", "Стамбул"]
+ROOM_TITLES = ["Стандарт", "Комфорт", "Полулюкс", "Люкс", "Семейный"]
+PASSWORD = "benchmark"
+# Фиксированное начало периода бронирований: данные одинаковы при каждом запуске с тем же --seed.
+START_DATE = date(2027, 1, 1)
+PERIOD_DAYS = 180
+
+
+@dataclass
+class BenchData:
+    """Идентификаторы засеянных данных, из которых сценарии выбирают параметры запросов."""
+    hotels_ids: list[int]
+    rooms: list[tuple[int, int]]  # (hotel_id, room_id)
+    emails: list[str]
+    tokens: list[str] = field(default_factory=list)
+
+
+def random_period(rng: random.Random) -> tuple[date, date]:
+    """Случайный период проживания 1–7 ночей внутри окна бенчмарка."""
+    date_from = START_DATE + timedelta(days=rng.randrange(PERIOD_DAYS))
+    return date_from, date_from + timedelta(days=rng.randint(1, 7))
+
+
+async def seed_database(
+        hotels: int,
+        rooms_per_hotel: int,
+        users: int,
+        bookings: int,
+        rng: random.Random,
+) -> BenchData:
+    """
+    Заполняет БД отелями, номерами, пользователями и бронированиями через репозитории.
+
+    Args:
+        hotels: число отелей.
+        rooms_per_hotel: число номеров в каждом отеле.
+        users: число пользователей.
+        bookings: число бронирований.
+        rng: генератор случайных чисел (для воспроизводимости).
+
+    Returns:
+        Идентификаторы созданных данных.
+    """
+    # Уникальный префикс email: повторный запуск на той же БД не упирается в unique.
+    run_id = f"{int(time.time())}{rng.randrange(1000):03d}"
+    # Хэш пароля одинаковый у всех — считаем argon2 один раз, а не users раз.
+    hashed_password = AuthService().hash_password(PASSWORD)
+
+    async with DBManager(session_factory=async_session_maker) as db:
+        hotels_ids = await db.hotels.add_bulk([
+            HotelAdd(title=f"Bench Hotel {i}", location=f"{rng.choice(LOCATIONS)}, ул. Тестовая, {i}")
+            for i in range(hotels)
+        ])
+        rooms_data = [
+            RoomAdd(
+                hotel_id=hotel_id,
+                title=rng.choice(ROOM_TITLES),
+                price=rng.randrange(50, 500, 10),
+                quantity=rng.randint(1, 5),
+            )
+            for hotel_id in hotels_ids
+            for _ in range(rooms_per_hotel)
+        ]
+        rooms_ids = await db.rooms.add_bulk(rooms_data)
+        emails = [f"bench-{run_id}-{i}@example.com" for i in range(users)]
+        users_ids = await db.users.add_bulk([UserAdd(email=email, hashed_password=hashed_password) for email in emails])
+
+        # Бронирования вставляются напрямую, без проверки остатка мест: нужен объем данных,
+        # а не точная загрузка (несколько пересечений на номер только утяжеляют поиск).
+        bookings_data = []
+        for _ in range(bookings):
+            index = rng.randrange(len(rooms_ids))
+            date_from, date_to = random_period(rng)
+            bookings_data.append(BookingAdd(
+                user_id=rng.choice(users_ids),
+                room_id=rooms_ids[index],
+                date_from=date_from,
+                date_to=date_to,
+                price=rooms_data[index].price,
+            ))
+        await db.bookings.add_bulk(bookings_data)
+        await db.commit()
+
+    rooms = [(room.hotel_id, room_id) for room, room_id in zip(rooms_data, rooms_ids)]
+    return BenchData(hotels_ids=hotels_ids, rooms=rooms, emails=emails)
+
+
+async def search_hotels(client: httpx.AsyncClient, data: BenchData, rng: random.Random) -> httpx.Response:
+    date_from, date_to = random_period(rng)
+    return await client.get("/hotels", params={
+        "sub_location": rng.choice(LOCATIONS)[:4].lower(),
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "per_page": 10,
+    })
+
+
+async def list_rooms(client: httpx.AsyncClient, data: BenchData, rng: random.Random) -> httpx.Response:
+    date_from, date_to = random_period(rng)
+    return await client.get(f"/hotels/{rng.choice(data.hotels_ids)}/rooms", params={
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+    })
+
+
+async def login(client: httpx.AsyncClient, data: BenchData, rng: random.Random) -> httpx.Response:
+    return await client.post("/auth/login", json={"email": rng.choice(data.emails), "password": PASSWORD})
+
+
+async def create_booking(client: httpx.AsyncClient, data: BenchData, rng: random.Random) -> httpx.Response:
+    _, room_id = rng.choice(data.rooms)
+    date_from, date_to = random_period(rng)
+    # Токен передаем явным заголовком: cookie клиента перезаписывает сценарий login.
+    return await client.post(
+        "/bookings",
+        json={"room_id": room_id, "date_from": date_from.isoformat(), "date_to": date_to.isoformat()},
+        headers={"Cookie": f"access_token={rng.choice(data.tokens)}"},
+    )
+
+
+# Сценарий -> (функция запроса, статусы, которые считаются успешными).
+# 409 у бронирования — нормальный ответ "мест нет", а не ошибка сервера.
+SCENARIOS: dict[str, tuple[Callable[..., Awaitable[httpx.Response]], set[int]]] = {
+    "search_hotels": (search_hotels, {200}),
+    "list_rooms": (list_rooms, {200}),
+    "login": (login, {200}),
+    "create_booking": (create_booking, {200, 409}),
+}
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Перцентиль методом ближайшего ранга по отсортированному списку."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+async def run_scenario(
+        client: httpx.AsyncClient,
+        name: str,
+        data: BenchData,
+        requests: int,
+        concurrency: int,
+        rng: random.Random,
+) -> dict:
+    """
+    Выполняет сценарий заданное число раз с заданной конкурентностью.
+
+    Args:
+        client: HTTP-клиент.
+        name: имя сценария из SCENARIOS.
+        data: засеянные данные.
+        requests: общее число запросов.
+        concurrency: число одновременно работающих клиентов.
+        rng: генератор случайных чисел.
+
+    Returns:
+        Словарь со статистикой: число запросов, ошибки, RPS и перцентили задержки в мс.
+    """
+    send, ok_statuses = SCENARIOS[name]
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await send(client, data, rng)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if status not in ok_statuses),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+    }
+
+
+def git_commit() -> str | None:
+    """Текущий коммит репозитория, чтобы результаты разных версий можно было сравнить."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def benchmark(args: argparse.Namespace) -> dict:
+    """
+    Засевает БД, прогоняет сценарии по очереди и собирает отчет.
+
+    Args:
+        args: аргументы командной строки.
+
+    Returns:
+        Отчет: параметры запуска и статистика по каждому сценарию.
+    """
+    rng = random.Random(args.seed)
+    data = await seed_database(args.hotels, args.rooms_per_hotel, args.users, args.bookings, rng)
+
+    # По умолчанию приложение вызывается в том же процессе (ASGI, без сети);
+    # с --base-url запросы идут на уже запущенный сервер (uvicorn/gunicorn).
+    async with AsyncExitStack() as stack:
+        if args.base_url:
+            client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        else:
+            from app.main import app
+
+            # ASGITransport не вызывает lifespan — запускаем его сами (воркеры фоновых задач).
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout)
+        await stack.enter_async_context(client)
+
+        # Токены для сценария бронирования получаем заранее, вне замеров.
+        for email in data.emails[:max(1, min(len(data.emails), args.concurrency))]:
+            response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+            response.raise_for_status()
+            data.tokens.append(response.json()["access_token"])
+
+        results = {}
+        for name in args.scenarios:
+            # Прогрев: пул соединений, кэш подготовленных выражений asyncpg, JIT-пути.
+            if args.warmup:
+                await run_scenario(client, name, data, args.warmup, args.concurrency, rng)
+            results[name] = await run_scenario(client, name, data, args.requests, args.concurrency, rng)
+
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": {
+            "hotels": args.hotels,
+            "rooms_per_hotel": args.rooms_per_hotel,
+            "users": args.users,
+            "bookings": args.bookings,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "target": args.base_url or "asgi",
+        },
+        "results": results,
+    }
+
+
+def main():
+    # Запуск на отдельной (не рабочей!) БД из настроек .env:
+    # python -m app.scripts.benchmark --concurrency 20 --requests 1000 --output bench.json
+    parser = argparse.ArgumentParser(description="Нагрузочный бенчмарк API BY_Hotels")
+    parser.add_argument("--hotels", type=int, default=500)
+    parser.add_argument("--rooms-per-hotel", type=int, default=10)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--bookings", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=500, help="запросов на сценарий")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20, help="запросов прогрева на сценарий")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--base-url", default=None, help="адрес запущенного сервера; без него — ASGI в процессе")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", default=None, help="файл для JSON-отчета (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(benchmark(args)), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        sys.stdout.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# app/scripts/cleanup_idempotency_keys.py
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.config import settings
+from app.database import async_session_maker
+from app.utils.db_manager import DBManager
+
+
+async def cleanup_idempotency_keys() -> int:
+    """
+    Удаляет ключи идемпотентности старше IDEMPOTENCY_KEY_TTL_HOURS.
+
+    Returns:
+        Число удаленных ключей.
+    """
+    created_before = datetime.now(timezone.utc) - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    async with DBManager(session_factory=async_session_maker) as db:
+        deleted = await db.idempotency_keys.delete_expired(created_before)
+        await db.commit()
+    return deleted
+
+
+def main():
+    # Запуск из корня репозитория (например, из cron раз в час):
+    # cd /path/to/BY_Hotels && python -m app.scripts.cleanup_idempotency_keys
+    print(f"Удалено ключей идемпотентности: {asyncio.run(cleanup_idempotency_keys())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# app/scripts/rebuild_room_inventory.py
+
+import argparse
+import asyncio
+import sys
+
+from app.database import async_session_maker
+from app.utils.db_manager import DBManager
+
+
+async def rebuild_room_inventory(rooms_ids: list[int] | None = None) -> None:
+    """
+    Пересчитывает занятость номеров по дням (room_inventory) из таблицы bookings.
+
+    Args:
+        rooms_ids: номера, для которых пересчитать инвентарь (если None — все).
+
+    Returns:
+        None.
+    """
+    # Пересчет идет одной транзакцией: читатели видят старые значения до COMMIT,
+    # а новые бронирования ждут его завершения (см. RoomInventoryRepository.rebuild).
+    async with DBManager(session_factory=async_session_maker) as db:
+        await db.room_inventory.rebuild(rooms_ids)
+        await db.commit()
+
+
+async def check_room_inventory(rooms_ids: list[int] | None = None) -> list[tuple]:
+    """
+    Сверяет room_inventory с таблицей bookings, ничего не меняя.
+
+    Args:
+        rooms_ids: номера, которые сверить (если None — все).
+
+    Returns:
+        Расходящиеся дни: (room_id, day, в инвентаре, по бронированиям).
+    """
+    async with DBManager(session_factory=async_session_maker) as db:
+        return await db.room_inventory.find_mismatches(rooms_ids)
+
+
+def main():
+    # Запуск из корня репозитория — полный пересчет после ручной правки bookings
+    # или восстановления из бэкапа:
+    # cd /path/to/BY_Hotels && python -m app.scripts.rebuild_room_inventory [--room-id 1 --room-id 2]
+    # Только сверка (например, после python -m app.scripts.benchmark --bookings 40000):
+    # python -m app.scripts.rebuild_room_inventory --check
+    parser = argparse.ArgumentParser(description="Пересчет занятости номеров по дням")
+    parser.add_argument("--room-id", dest="rooms_ids", type=int, action="append", default=None,
+                        help="пересчитать только этот номер (можно повторять)")
+    parser.add_argument("--check", action="store_true",
+                        help="только сверить инвентарь с бронированиями; код выхода 1 при расхождениях")
+    args = parser.parse_args()
+    if not args.check:
+        asyncio.run(rebuild_room_inventory(args.rooms_ids))
+        return
+    mismatches = asyncio.run(check_room_inventory(args.rooms_ids))
+    for room_id, day, stored, expected in mismatches:
+        print(f"room_id={room_id} day={day}: в инвентаре {stored}, по бронированиям {expected}")
+    print(f"Расхождений: {len(mismatches)}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
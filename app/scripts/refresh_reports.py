@@ -0,0 +1,29 @@
+# app/scripts/refresh_reports.py
+
+import asyncio
+
+from app.database import async_session_maker
+from app.utils.db_manager import DBManager
+
+
+async def refresh_reports() -> None:
+    """
+    Пересчитывает материализованные представления отчетов.
+
+    Returns:
+        None.
+    """
+    # CONCURRENTLY: отчеты продолжают читаться из старой версии, пока считается новая.
+    async with DBManager(session_factory=async_session_maker) as db:
+        await db.reports.refresh_revenue_view()
+        await db.commit()
+
+
+def main():
+    # Запуск из корня репозитория (например, из cron раз в час):
+    # cd /path/to/BY_Hotels && python -m app.scripts.refresh_reports
+    asyncio.run(refresh_reports())
+
+
+if __name__ == "__main__":
+    main()
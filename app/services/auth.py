@@ -1,16 +1,33 @@
 # app/services/auth.py
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from fastapi import HTTPException
 from passlib.context import CryptContext
 import jwt
 
 from app.config import settings
+from app.services.tokens import signing_key, token_verifier
 
 
 class AuthService:
     """Вспомогательные методы авторизации: хэширование/проверка паролей и JWT-токены."""
-    pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+    pwd_context = CryptContext(
+        schemes=["argon2"],
+        deprecated="auto",
+        argon2__time_cost=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+    )
+    # Отдельный ограниченный пул потоков: Argon2 отпускает GIL, поэтому хэширование
+    # идет параллельно и не блокирует event loop.
+    hash_executor = ThreadPoolExecutor(
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        thread_name_prefix="password-hash",
+    )
+    # Число хэширований в работе и в очереди пула (меняется только из event loop).
+    hash_pending = 0
 
     def create_access_token(self, data: dict) -> str:
         """
@@ -20,7 +37,8 @@ class AuthService:
         - Добавляет claim "exp" (время истечения) в UTC на основе настроек приложения,
           чтобы все сервисы интерпретировали срок жизни одинаково.
         - "exp" — стандартный JWT-claim, по которому библиотеки проверяют истечение токена.
-        - Подписывает токен секретным ключом и алгоритмом из настроек, чтобы защитить от подмены.
+        - Подписывает токен ключом и алгоритмом из настроек, чтобы защитить от подмены;
+          в заголовок пишется kid, чтобы проверяющая сторона выбрала нужный открытый ключ.
 
         :param data: словарь с полезной нагрузкой (например, {"sub": user_id}).
         :return: строка JWT-токена.
@@ -29,9 +47,10 @@ class AuthService:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         to_encode["exp"] = expire
         return jwt.encode(
-            to_encode, 
-            settings.JWT_SECRET_KEY, 
-            algorithm=settings.JWT_ALGORITHM
+            to_encode,
+            signing_key,
+            algorithm=settings.JWT_ALGORITHM,
+            headers={"kid": settings.JWT_KEY_ID} if settings.JWT_KEY_ID else None,
         )
 
     def hash_password(self, password: str) -> str:
@@ -66,8 +85,58 @@ class AuthService:
         return self.pwd_context.verify(plain_password, hashed_password)
     
 
-    def decode_token(self, token: str) -> dict:
+    async def run_in_hash_pool(self, func, *args):
+        """
+        Выполняет функцию хэширования в пуле потоков с ограничением очереди.
+
+        Args:
+            func: синхронная функция (hash/verify).
+            *args: аргументы функции.
+
+        Returns:
+            Результат функции.
+
+        Raises:
+            HTTPException: 503, если очередь на хэширование переполнена.
+        """
+        # Back-pressure: при переполненной очереди сразу отказываем, а не копим ожидание.
+        if AuthService.hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise HTTPException(
+                status_code=503,
+                detail="Сервис перегружен, повторите попытку позже",
+                headers={"Retry-After": "1"},
+            )
+        AuthService.hash_pending += 1
         try:
-            return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        except jwt.exceptions.DecodeError:
-            raise HTTPException(status_code=401, detail="Неверный токен")
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.hash_executor, func, *args)
+        finally:
+            AuthService.hash_pending -= 1
+
+    async def hash_password_async(self, password: str) -> str:
+        """
+        Асинхронный вариант hash_password: хэширует пароль вне event loop.
+
+        :param password: пароль в открытом виде.
+        :return: строка хэша для хранения в базе.
+        """
+        return await self.run_in_hash_pool(self.hash_password, password)
+
+    async def verify_password_async(self, plain_password, hashed_password) -> bool:
+        """
+        Асинхронный вариант verify_password: проверяет пароль вне event loop.
+
+        :param plain_password: пароль в открытом виде (ввод пользователя).
+        :param hashed_password: сохраненный в базе хэш пароля.
+        :return: True, если пароль корректный, иначе False.
+        """
+        return await self.run_in_hash_pool(self.verify_password, plain_password, hashed_password)
+
+    def decode_token(self, token: str) -> dict:
+        """
+        Проверяет токен и возвращает его payload (через общий TokenVerifier с кэшем).
+
+        :param token: строка JWT-токена.
+        :return: словарь claims токена.
+        """
+        return token_verifier.decode(token)
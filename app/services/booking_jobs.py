@@ -0,0 +1,47 @@
+# app/services/booking_jobs.py
+
+import json
+import logging
+
+from app.database import async_session_maker
+from app.utils.db_manager import DBManager
+from app.utils.jobs import job_queue
+
+notifications_logger = logging.getLogger("app.notifications")
+analytics_logger = logging.getLogger("app.analytics")
+
+
+@job_queue.handler("send_booking_confirmation")
+async def send_booking_confirmation(payload: dict) -> None:
+    """
+    Отправляет гостю подтверждение бронирования.
+
+    Args:
+        payload: {"booking_id": ...}.
+    """
+    async with DBManager(session_factory=async_session_maker) as db:
+        booking = await db.bookings.get_one_or_none(id=payload["booking_id"])
+        # Бронирование успели удалить — подтверждать нечего.
+        if booking is None:
+            return
+        user = await db.users.get_one_or_none(id=booking.user_id)
+    # Пользователя удалили — письмо отправить некуда, повтор задачи не поможет.
+    if user is None:
+        return
+    # Почтового сервиса в проекте пока нет: письмо-подтверждение пишется в лог.
+    notifications_logger.info(json.dumps({
+        "event": "booking_confirmation",
+        "email": user.email,
+        "booking": booking.model_dump(mode="json"),
+    }, ensure_ascii=False))
+
+
+@job_queue.handler("track_booking_created")
+async def track_booking_created(payload: dict) -> None:
+    """
+    Отправляет событие аналитики о новом бронировании.
+
+    Args:
+        payload: параметры бронирования (id, номер, даты, цена).
+    """
+    analytics_logger.info(json.dumps({"event": "booking_created", **payload}, ensure_ascii=False))
@@ -0,0 +1,182 @@
+# app/services/tokens.py
+
+import time
+from collections import OrderedDict
+
+import jwt
+from fastapi import HTTPException
+
+from app.config import settings
+
+
+def is_symmetric(algorithm: str) -> bool:
+    """
+    Проверяет, использует ли алгоритм общий секрет (HS256/HS384/HS512).
+
+    Args:
+        algorithm: имя алгоритма JWT.
+
+    Returns:
+        True для HMAC-алгоритмов, иначе False.
+    """
+    return algorithm.startswith("HS")
+
+
+def load_signing_key():
+    """
+    Загружает ключ подписи токенов из настроек и подготавливает его один раз.
+
+    Returns:
+        Подготовленный ключ: секрет для HS*, объект закрытого ключа для RS*/ES*/EdDSA.
+
+    Raises:
+        ValueError: если для выбранного алгоритма не задан ключ.
+    """
+    algorithm = jwt.get_algorithm_by_name(settings.JWT_ALGORITHM)
+    if is_symmetric(settings.JWT_ALGORITHM):
+        if not settings.JWT_SECRET_KEY:
+            raise ValueError("Для HS-алгоритмов нужен JWT_SECRET_KEY")
+        return algorithm.prepare_key(settings.JWT_SECRET_KEY)
+    if settings.JWT_PRIVATE_KEY_PATH is None:
+        raise ValueError("Для асимметричных алгоритмов нужен JWT_PRIVATE_KEY_PATH")
+    return algorithm.prepare_key(settings.JWT_PRIVATE_KEY_PATH.read_bytes())
+
+
+def load_verification_keys(signing_key) -> dict:
+    """
+    Собирает ключи проверки по kid: текущий ключ и ключи, оставленные на время ротации.
+
+    Args:
+        signing_key: подготовленный ключ подписи.
+
+    Returns:
+        Словарь {kid: подготовленный ключ проверки}; kid может быть None.
+    """
+    # Для HS* проверяем тем же секретом; для асимметричных — открытой частью ключа.
+    if is_symmetric(settings.JWT_ALGORITHM):
+        return {settings.JWT_KEY_ID: signing_key}
+    algorithm = jwt.get_algorithm_by_name(settings.JWT_ALGORITHM)
+    keys = {settings.JWT_KEY_ID: signing_key.public_key()}
+    # Предыдущие (или уже выпущенные, но еще не основные) открытые ключи — для ротации.
+    for kid, path in settings.JWT_PUBLIC_KEYS.items():
+        keys[kid] = algorithm.prepare_key(path.read_bytes())
+    return keys
+
+
+def build_jwks(verification_keys: dict) -> dict:
+    """
+    Формирует JWKS (набор открытых ключей) для проверки токенов другими сервисами.
+
+    Args:
+        verification_keys: словарь {kid: ключ проверки}.
+
+    Returns:
+        Словарь в формате JWKS; для HS* список ключей пуст — секрет не публикуется.
+    """
+    if is_symmetric(settings.JWT_ALGORITHM):
+        return {"keys": []}
+    algorithm = jwt.get_algorithm_by_name(settings.JWT_ALGORITHM)
+    keys = []
+    for kid, key in verification_keys.items():
+        jwk = algorithm.to_jwk(key, as_dict=True)
+        jwk.update({"use": "sig", "alg": settings.JWT_ALGORITHM})
+        if kid is not None:
+            jwk["kid"] = kid
+        keys.append(jwk)
+    return {"keys": keys}
+
+
+class TokenVerifier:
+    """
+    Проверяет JWT access-токены с заранее подготовленными ключами и кэшем расшифрованных claims.
+
+    Ключи разбираются один раз при создании, ключ проверки выбирается по kid из заголовка,
+    а повторная проверка того же токена берется из памяти до истечения TTL кэша
+    или claim "exp" (что наступит раньше).
+
+    Кэш не потокобезопасен: decode вызывается из event loop (см. get_current_user_id).
+    """
+
+    def __init__(self, keys: dict, algorithm: str, max_items: int, ttl: int):
+        self.algorithm = algorithm
+        self.keys = keys
+        self.max_items = max_items
+        self.ttl = ttl
+        self.claims: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def find_key(self, token: str):
+        """
+        Выбирает ключ проверки по kid из заголовка токена.
+
+        Args:
+            token: строка JWT-токена.
+
+        Returns:
+            Подготовленный ключ проверки.
+
+        Raises:
+            HTTPException: 401, если заголовок не читается или kid неизвестен.
+        """
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.exceptions.InvalidTokenError:
+            raise HTTPException(status_code=401, detail="Неверный токен")
+        if kid in self.keys:
+            return self.keys[kid]
+        # Токены, выпущенные до появления kid, проверяем единственным ключом.
+        if kid is None and len(self.keys) == 1:
+            return next(iter(self.keys.values()))
+        raise HTTPException(status_code=401, detail="Неизвестный ключ подписи токена")
+
+    def decode(self, token: str) -> dict:
+        """
+        Проверяет подпись и срок действия токена и возвращает его payload.
+
+        Args:
+            token: строка JWT-токена.
+
+        Returns:
+            Словарь claims токена.
+
+        Raises:
+            HTTPException: 401, если токен истек или неверен.
+        """
+        # Быстрый путь: токен уже проверяли, и запись в кэше еще действительна.
+        cached = self.claims.get(token)
+        if cached is not None:
+            expires_at, claims = cached
+            if expires_at > time.time():
+                self.claims.move_to_end(token)
+                return claims
+            self.claims.pop(token, None)
+
+        key = self.find_key(token)
+        try:
+            claims = jwt.decode(token, key, algorithms=[self.algorithm])
+        except jwt.exceptions.ExpiredSignatureError:
+            raise HTTPException(status_code=401, detail="Срок действия токена истек")
+        except jwt.exceptions.InvalidTokenError:
+            raise HTTPException(status_code=401, detail="Неверный токен")
+
+        # Запись в кэше не должна пережить сам токен.
+        expires_at = time.time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, claims["exp"])
+        self.claims[token] = (expires_at, claims)
+        # Вытесняем самые давно использованные токены сверх лимита.
+        while len(self.claims) > self.max_items:
+            self.claims.popitem(last=False)
+        return claims
+
+
+# Ключи читаются и разбираются один раз при старте процесса.
+signing_key = load_signing_key()
+verification_keys = load_verification_keys(signing_key)
+jwks = build_jwks(verification_keys)
+
+token_verifier = TokenVerifier(
+    keys=verification_keys,
+    algorithm=settings.JWT_ALGORITHM,
+    max_items=settings.JWT_CACHE_MAX_ITEMS,
+    ttl=settings.JWT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,203 @@
+# app/utils/cache.py
+
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from pydantic import TypeAdapter
+
+from app.config import settings
+
+
+class CacheLoadCancelled(Exception):
+    """Загрузка значения прервана вместе с запросом, который ее выполнял; ожидающие загружают сами."""
+
+
+class MemoryCacheBackend:
+    """LRU-кэш в памяти процесса с TTL на каждую запись."""
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self.items: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        # Версии пространств имен храним отдельно: их нельзя вытеснять,
+        # иначе сброс версии "воскресит" старые записи.
+        self.counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        item = self.items.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self.items[key]
+            return None
+        # Отмечаем запись как недавно использованную.
+        self.items.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.items[key] = (time.monotonic() + ttl, value)
+        self.items.move_to_end(key)
+        # Вытесняем самые давно использованные записи сверх лимита.
+        while len(self.items) > self.max_items:
+            self.items.popitem(last=False)
+
+    async def get_counter(self, key: str) -> int:
+        return self.counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+
+class RedisCacheBackend:
+    """
+    Кэш в Redis (или любом сервере с протоколом Redis).
+
+    Принимает клиент с интерфейсом redis.asyncio.Redis, поэтому в тестах вместо
+    сервера можно передать fakeredis.FakeAsyncRedis (in-memory FakeServer).
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(key, value, ex=ttl)
+
+    async def get_counter(self, key: str) -> int:
+        value = await self.client.get(key)
+        return int(value) if value is not None else 0
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+
+class Cache:
+    """
+    Read-through кэш поверх бэкенда с версионированием пространств имен.
+
+    Ключ записи включает версию пространства имен (например, "hotels"), поэтому
+    инвалидация всего пространства — один INCR, без перебора ключей.
+
+    Реплика может еще не получить изменение, после которого кэш сбросили. Поэтому
+    replica_lag секунд после инвалидации значения, прочитанные с реплики, в кэш не кладутся:
+    иначе старые строки легли бы под новую версию на весь TTL.
+    """
+
+    def __init__(self, backend, ttl: int, replica_lag: int = 0):
+        self.backend = backend
+        self.ttl = ttl
+        self.replica_lag = replica_lag
+        # Незавершенные загрузки по ключу: защита от stampede внутри процесса.
+        self.loading: dict[str, asyncio.Future] = {}
+
+    async def get_or_load(
+            self,
+            namespace: str,
+            key: str,
+            loader: Callable[[], Awaitable[Any]],
+            adapter: TypeAdapter,
+            from_replica: bool = False,
+    ) -> Any:
+        """
+        Возвращает значение из кэша или загружает его и кладет в кэш.
+
+        Args:
+            namespace: пространство имен (обычно имя таблицы).
+            key: ключ внутри пространства имен.
+            loader: корутина-функция, читающая значение из БД.
+            adapter: TypeAdapter для (де)сериализации значения в JSON.
+            from_replica: loader читает с реплики, а не из основной БД.
+
+        Returns:
+            Значение из кэша или из loader.
+        """
+        # Версия пространства имен входит в ключ: после инвалидации старые записи не читаются.
+        version = await self.backend.get_counter(f"{namespace}:version")
+        full_key = f"{namespace}:v{version}:{key}"
+        cached = await self.backend.get(full_key)
+        if cached is not None:
+            return adapter.validate_json(cached)
+
+        # Пространство имен недавно менялось, а читаем с реплики — отдаем без записи в кэш.
+        if from_replica and self.replica_lag and await self.backend.get(f"{namespace}:changed") is not None:
+            return await loader()
+
+        # Если этот ключ уже загружается другим запросом — ждем его результат,
+        # а не отправляем в БД еще один одинаковый запрос.
+        if full_key in self.loading:
+            try:
+                return await asyncio.shield(self.loading[full_key])
+            except CacheLoadCancelled:
+                # Загружавший запрос отменили (клиент отключился) — это не ошибка этого запроса:
+                # повторяем, и один из ожидавших становится новым загружающим.
+                return await self.get_or_load(namespace, key, loader, adapter, from_replica)
+
+        future = asyncio.get_running_loop().create_future()
+        self.loading[full_key] = future
+        try:
+            value = await loader()
+            # Разброс TTL, чтобы записи, созданные одновременно, не истекали одновременно.
+            ttl = self.ttl + random.randint(0, max(1, self.ttl // 10))
+            await self.backend.set(full_key, adapter.dump_json(value), ttl)
+            future.set_result(value)
+            return value
+        except Exception as ex:
+            future.set_exception(ex)
+            # Исключение уже передано ожидающим; помечаем его полученным для самого future.
+            future.exception()
+            raise
+        finally:
+            # Загрузку отменили (например, клиент отключился) — не оставляем ожидающих висеть
+            # и не передаем им отмену: они получают CacheLoadCancelled и загружают сами.
+            if not future.done():
+                future.set_exception(CacheLoadCancelled())
+                future.exception()
+            del self.loading[full_key]
+
+    async def invalidate(self, namespace: str) -> None:
+        """
+        Инвалидирует все записи пространства имен.
+
+        Args:
+            namespace: пространство имен (обычно имя таблицы).
+        """
+        await self.backend.incr(f"{namespace}:version")
+        # Метка "недавно изменено" живет, пока реплики могут отставать.
+        if self.replica_lag:
+            await self.backend.set(f"{namespace}:changed", b"1", self.replica_lag)
+
+
+def build_cache() -> Cache | None:
+    """
+    Создает кэш по настройкам приложения.
+
+    Returns:
+        Экземпляр Cache или None, если кэширование выключено.
+    """
+    # Без реплик все чтения идут из основной БД, и отставание учитывать не нужно.
+    replica_lag = settings.DB_REPLICA_MAX_LAG_SECONDS if settings.DB_REPLICA_URLS else 0
+    if settings.CACHE_BACKEND == "memory":
+        return Cache(
+            MemoryCacheBackend(max_items=settings.CACHE_MAX_ITEMS),
+            ttl=settings.CACHE_TTL_SECONDS,
+            replica_lag=replica_lag,
+        )
+    if settings.CACHE_BACKEND == "redis":
+        # redis нужен только для этого бэкенда, поэтому импортируем его здесь.
+        from redis.asyncio import Redis
+
+        return Cache(
+            RedisCacheBackend(Redis.from_url(settings.REDIS_URL)),
+            ttl=settings.CACHE_TTL_SECONDS,
+            replica_lag=replica_lag,
+        )
+    return None
+
+
+cache = build_cache()
@@ -1,28 +1,97 @@
 # app/utils/db_manager.py
 
+from functools import cached_property
+
 from app.repositories.bookings import BookingsRepository
 from app.repositories.hotels import HotelsRepository
+from app.repositories.idempotency_keys import IdempotencyKeysRepository
+from app.repositories.jobs import JobsRepository
+from app.repositories.reports import ReportsRepository
+from app.repositories.room_inventory import RoomInventoryRepository
 from app.repositories.rooms import RoomsRepository
 from app.repositories.users import UsersRepository
+from app.schemas.jobs import JobAdd
+from app.utils.cache import cache
+from app.utils.jobs import job_queue
 
 
 class DBManager:
     def __init__(self, session_factory):
         self.session_factory = session_factory
+        self._session = None
 
     async def __aenter__(self):
-        self.session = self.session_factory()
-
-        self.hotels = HotelsRepository(self.session)
-        self.rooms = RoomsRepository(self.session)
-        self.users = UsersRepository(self.session)
-        self.bookings = BookingsRepository(self.session)
-
+        # Сессия и репозитории создаются лениво — при первом обращении.
+        # Запрос, завершившийся раньше (401, ответ из кэша), не трогает БД вовсе.
         return self
 
     async def __aexit__(self, *args):
-        await self.session.rollback()
-        await self.session.close()
+        if self._session is None:
+            return
+        # ROLLBACK нужен только если транзакция реально началась (был хотя бы один запрос).
+        if self._session.in_transaction():
+            await self._session.rollback()
+        await self._session.close()
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = self.session_factory()
+        return self._session
+
+    @cached_property
+    def hotels(self) -> HotelsRepository:
+        return HotelsRepository(self.session)
+
+    @cached_property
+    def rooms(self) -> RoomsRepository:
+        return RoomsRepository(self.session)
+
+    @cached_property
+    def users(self) -> UsersRepository:
+        return UsersRepository(self.session)
+
+    @cached_property
+    def bookings(self) -> BookingsRepository:
+        return BookingsRepository(self.session)
+
+    @cached_property
+    def room_inventory(self) -> RoomInventoryRepository:
+        return RoomInventoryRepository(self.session)
+
+    @cached_property
+    def idempotency_keys(self) -> IdempotencyKeysRepository:
+        return IdempotencyKeysRepository(self.session)
+
+    @cached_property
+    def jobs(self) -> JobsRepository:
+        return JobsRepository(self.session)
+
+    @cached_property
+    def reports(self) -> ReportsRepository:
+        return ReportsRepository(self.session)
+
+    async def enqueue_job(self, name: str, payload: dict) -> None:
+        """
+        Ставит фоновую задачу, которая выполнится только если транзакция будет зафиксирована.
+
+        Args:
+            name: имя задачи (обработчик регистрируется через job_queue.handler).
+            payload: JSON-совместимые параметры задачи.
+        """
+        job = JobAdd(name=name, payload=payload)
+        # В режиме Postgres задача пишется в ту же транзакцию, что и данные (outbox).
+        if job_queue.persistent:
+            await self.jobs.add_job(job)
+        self.session.info.setdefault("pending_jobs", []).append(job)
 
     async def commit(self):
-        await self.session.commit()
\ No newline at end of file
+        if self._session is None:
+            return
+        await self._session.commit()
+        # Транзакция зафиксирована — отдаем ее фоновые задачи воркерам.
+        job_queue.after_commit(self._session.info.pop("pending_jobs", []))
+        # Данные зафиксированы — сбрасываем кэш чтения для измененных таблиц.
+        if cache is not None:
+            for namespace in self._session.info.pop("changed_namespaces", ()):
+                await cache.invalidate(namespace)
\ No newline at end of file
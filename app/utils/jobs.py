@@ -0,0 +1,278 @@
+# app/utils/jobs.py
+
+import asyncio
+import logging
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable
+
+from app.config import settings
+from app.repositories.jobs import JobsRepository
+from app.schemas.jobs import JobAdd
+
+logger = logging.getLogger("app.jobs")
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+
+@dataclass
+class JobMetrics:
+    """Исходы фоновых задач в этом процессе (с момента старта)."""
+    completed: int = 0
+    retried: int = 0
+    failed: int = 0
+    # Задачи режима "в памяти", не выполненные к остановке (в очереди или в ожидании повтора).
+    dropped: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class JobQueue:
+    """
+    Очередь фоновых задач с пулом asyncio-воркеров в процессе приложения.
+
+    Два режима хранения:
+    - в памяти (asyncio.Queue): быстро, но задачи теряются при рестарте процесса;
+    - в Postgres (таблица jobs): задача пишется в той же транзакции, что и данные,
+      воркеры любого процесса забирают ее через FOR UPDATE SKIP LOCKED и аренду (run_at).
+
+    Задачи ставятся через DBManager.enqueue_job() и попадают к воркерам только после
+    COMMIT. Упавшая задача повторяется с экспоненциальной задержкой до max_attempts раз.
+    """
+
+    def __init__(
+            self,
+            persistent: bool,
+            workers: int,
+            max_attempts: int,
+            retry_delay: float,
+            poll_interval: float,
+            shutdown_timeout: float,
+            lease: float,
+    ):
+        self.persistent = persistent
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.shutdown_timeout = shutdown_timeout
+        self.lease = lease
+        self.handlers: dict[str, JobHandler] = {}
+        # Очередь режима "в памяти": (задача, номер уже сделанных попыток).
+        self.queue: asyncio.Queue[tuple[JobAdd, int]] = asyncio.Queue()
+        # Отложенные повторы режима "в памяти": до срока задача не лежит в очереди.
+        self.pending_retries: set[asyncio.TimerHandle] = set()
+        self.metrics = JobMetrics()
+        # Будит воркеры режима Postgres сразу после COMMIT задачи в этом процессе.
+        self.wakeup = asyncio.Event()
+        self.tasks: list[asyncio.Task] = []
+        self.session_factory = None
+        self.stopping = False
+
+    def handler(self, name: str) -> Callable[[JobHandler], JobHandler]:
+        """
+        Регистрирует обработчик задачи (декоратор).
+
+        Args:
+            name: имя задачи.
+
+        Returns:
+            Декоратор, возвращающий функцию без изменений.
+        """
+        def register(func: JobHandler) -> JobHandler:
+            self.handlers[name] = func
+            return func
+
+        return register
+
+    def retry_delay_for(self, attempt: int) -> float:
+        """Задержка перед повтором после attempt-й неудачной попытки (5, 10, 20, ... секунд)."""
+        return self.retry_delay * 2 ** (attempt - 1)
+
+    def after_commit(self, jobs: list[JobAdd]) -> None:
+        """
+        Передает воркерам задачи только что зафиксированной транзакции.
+
+        Args:
+            jobs: задачи, поставленные в транзакции.
+        """
+        if not jobs:
+            return
+        # В режиме Postgres задачи уже в таблице — достаточно разбудить воркеры.
+        if self.persistent:
+            self.wakeup.set()
+            return
+        for job in jobs:
+            self.queue.put_nowait((job, 0))
+
+    async def execute(self, job: JobAdd) -> None:
+        """
+        Выполняет задачу зарегистрированным обработчиком.
+
+        Raises:
+            LookupError: если обработчик для задачи не зарегистрирован (повтор не поможет).
+        """
+        handler = self.handlers.get(job.name)
+        if handler is None:
+            raise LookupError(f"Нет обработчика для задачи {job.name}")
+        await handler(job.payload)
+
+    async def start(self, session_factory) -> None:
+        """
+        Запускает воркеры (вызывается при старте приложения).
+
+        Args:
+            session_factory: фабрика сессий основной БД (для режима Postgres).
+        """
+        self.session_factory = session_factory
+        self.stopping = False
+        worker = self.postgres_worker if self.persistent else self.memory_worker
+        self.tasks = [asyncio.create_task(worker(), name=f"job-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        """
+        Останавливает воркеры, дождавшись текущих задач (не дольше shutdown_timeout).
+
+        В режиме Postgres прерванная задача останется в таблице и повторится после аренды;
+        в режиме "в памяти" невыполненные задачи (в очереди и в ожидании повтора) теряются —
+        их число пишется в лог и в счетчик metrics.dropped.
+        """
+        self.stopping = True
+        self.wakeup.set()
+        try:
+            if self.persistent:
+                await asyncio.wait_for(asyncio.gather(*self.tasks), self.shutdown_timeout)
+            else:
+                await asyncio.wait_for(self.queue.join(), self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Фоновые задачи не завершились за %s с", self.shutdown_timeout)
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.persistent:
+            return
+        for handle in self.pending_retries:
+            handle.cancel()
+        queued, delayed = self.queue.qsize(), len(self.pending_retries)
+        self.pending_retries.clear()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.queue.task_done()
+        if queued or delayed:
+            self.metrics.dropped += queued + delayed
+            logger.error("При остановке потеряно фоновых задач: %s в очереди, %s в ожидании повтора", queued, delayed)
+
+    def schedule_retry(self, job: JobAdd, attempts: int) -> None:
+        """
+        Возвращает задачу в очередь режима "в памяти" после задержки повтора.
+
+        Args:
+            job: задача.
+            attempts: число уже сделанных попыток.
+        """
+        def requeue() -> None:
+            self.pending_retries.discard(handle)
+            self.queue.put_nowait((job, attempts))
+
+        handle = asyncio.get_running_loop().call_later(self.retry_delay_for(attempts), requeue)
+        self.pending_retries.add(handle)
+
+    async def memory_worker(self) -> None:
+        """
+        Воркер режима "в памяти": выполняет задачи из asyncio.Queue до отмены в stop().
+
+        Упавшая задача возвращается в очередь через retry_delay_for(attempts) секунд
+        (schedule_retry); после max_attempts попыток или без обработчика — провалена.
+        """
+        while True:
+            job, attempts = await self.queue.get()
+            try:
+                await self.execute(job)
+                self.metrics.completed += 1
+            except Exception as ex:
+                attempts += 1
+                if isinstance(ex, LookupError) or attempts >= self.max_attempts:
+                    logger.exception("Задача %s провалена после %s попыток", job.name, attempts)
+                    self.metrics.failed += 1
+                else:
+                    logger.warning("Задача %s упала (попытка %s), повтор: %r", job.name, attempts, ex)
+                    self.metrics.retried += 1
+                    self.schedule_retry(job, attempts)
+            finally:
+                self.queue.task_done()
+
+    async def postgres_worker(self) -> None:
+        """
+        Воркер режима Postgres: забирает готовые задачи из таблицы jobs, пока не вызван stop().
+
+        Когда задач нет, ждет COMMIT новой задачи в этом процессе (wakeup) или poll_interval секунд.
+        """
+        while not self.stopping:
+            # Ошибка БД (обрыв соединения, переключение на реплику) не должна останавливать
+            # воркер навсегда: пишем ее в лог и пробуем снова после паузы опроса.
+            try:
+                if await self.process_next():
+                    continue
+            except Exception:
+                logger.exception("Ошибка воркера фоновых задач, повтор через %s с", self.poll_interval)
+            # Готовых задач нет: ждем COMMIT новой задачи в этом процессе или следующего опроса.
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            if not self.stopping:
+                self.wakeup.clear()
+
+    async def process_next(self) -> bool:
+        """
+        Забирает и выполняет одну задачу из таблицы jobs (режим Postgres).
+
+        Захват и запись результата — две короткие транзакции; обработчик выполняется
+        между ними, не держа открытой транзакции и второго соединения из пула.
+
+        Returns:
+            True, если задача была; False, если готовых задач нет.
+        """
+        async with self.session_factory() as session:
+            job = await JobsRepository(session).claim(self.lease)
+            await session.commit()
+        if job is None:
+            return False
+
+        error = None
+        # Аренда истекала уже max_attempts раз (воркер падал на этой задаче) — больше не запускаем.
+        if job.attempts > self.max_attempts:
+            error = LookupError(f"Аренда задачи истекла {self.max_attempts} раз")
+        else:
+            try:
+                await self.execute(job)
+            except Exception as ex:
+                error = ex
+
+        async with self.session_factory() as session:
+            jobs = JobsRepository(session)
+            if error is None:
+                await jobs.complete(job)
+                self.metrics.completed += 1
+            elif isinstance(error, LookupError) or job.attempts >= self.max_attempts:
+                logger.error("Задача %s (id=%s) провалена после %s попыток", job.name, job.id, job.attempts, exc_info=error)
+                await jobs.fail(job, repr(error))
+                self.metrics.failed += 1
+            else:
+                logger.warning("Задача %s (id=%s) упала (попытка %s), повтор: %r", job.name, job.id, job.attempts, error)
+                await jobs.retry(job, self.retry_delay_for(job.attempts), repr(error))
+                self.metrics.retried += 1
+            await session.commit()
+        return True
+
+
+job_queue = JobQueue(
+    persistent=settings.JOBS_BACKEND == "postgres",
+    workers=settings.JOBS_WORKERS,
+    max_attempts=settings.JOBS_MAX_ATTEMPTS,
+    retry_delay=settings.JOBS_RETRY_DELAY_SECONDS,
+    poll_interval=settings.JOBS_POLL_INTERVAL_SECONDS,
+    shutdown_timeout=settings.JOBS_SHUTDOWN_TIMEOUT_SECONDS,
+    lease=settings.JOBS_LEASE_SECONDS,
+)
@@ -0,0 +1,224 @@
+# app/utils/query_stats.py
+
+import json
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger("app.sql.slow")
+
+# Границы гистограммы "число SQL-выражений на запрос": N+1 виден как сдвиг в правые корзины.
+STATEMENTS_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+@dataclass
+class RequestQueryStats:
+    """Счетчики SQL одного HTTP-запроса."""
+    method: str
+    scope: dict
+    statements: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+
+    @property
+    def route(self) -> str:
+        # Шаблон маршрута ("/hotels/{hotel_id}") появляется в scope после роутинга;
+        # сырой путь не используем, чтобы не раздувать число меток в метриках.
+        route = self.scope.get("route")
+        return getattr(route, "path", "<unmatched>")
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing."""
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.statements} statements", '
+            f"db-pool;dur={self.pool_wait_seconds * 1000:.2f}"
+        )
+
+
+@dataclass
+class RouteQueryMetrics:
+    """Накопленные счетчики SQL по одному маршруту (с момента старта процесса)."""
+    requests: int = 0
+    statements: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    slow_statements: int = 0
+    statements_buckets: list[int] = field(default_factory=lambda: [0] * (len(STATEMENTS_BUCKETS) + 1))
+
+
+@dataclass
+class StatementCacheMetrics:
+    """Попадания в кэш подготовленных выражений asyncpg (с момента старта процесса)."""
+    hits: int = 0
+    misses: int = 0
+
+    def as_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / total, 4) if total else None}
+
+
+# Статистика текущего запроса; вне HTTP-запроса (скрипты, миграции) — None.
+current_query_stats: ContextVar[RequestQueryStats | None] = ContextVar("current_query_stats", default=None)
+route_metrics: dict[tuple[str, str], RouteQueryMetrics] = {}
+statement_cache_metrics = StatementCacheMetrics()
+
+
+def start_request(method: str, scope: dict) -> RequestQueryStats:
+    """
+    Начинает сбор статистики SQL для HTTP-запроса.
+
+    Args:
+        method: HTTP-метод.
+        scope: ASGI scope запроса (из него позже берется шаблон маршрута).
+
+    Returns:
+        Объект статистики, который заполняют события движка.
+    """
+    stats = RequestQueryStats(method=method, scope=scope)
+    current_query_stats.set(stats)
+    return stats
+
+
+def finish_request(stats: RequestQueryStats) -> None:
+    """
+    Добавляет статистику завершенного запроса к метрикам его маршрута.
+
+    Args:
+        stats: статистика запроса из start_request.
+    """
+    metrics = route_metrics.setdefault((stats.method, stats.route), RouteQueryMetrics())
+    metrics.requests += 1
+    metrics.statements += stats.statements
+    metrics.db_seconds += stats.db_seconds
+    metrics.pool_wait_seconds += stats.pool_wait_seconds
+    metrics.statements_buckets[bisect_left(STATEMENTS_BUCKETS, stats.statements)] += 1
+
+
+def record_pool_wait(seconds: float) -> None:
+    """
+    Учитывает время ожидания соединения из пула в статистике текущего запроса.
+
+    Args:
+        seconds: время ожидания в секундах.
+    """
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+def setup_query_stats(engine) -> None:
+    """
+    Подключает к движку подсчет SQL-выражений по запросам и лог медленных запросов.
+
+    Args:
+        engine: асинхронный движок SQLAlchemy.
+    """
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Диалект asyncpg в SQLAlchemy держит на каждом соединении LRU подготовленных
+        # выражений с ключом — текстом SQL: есть текст в кэше — PREPARE не понадобится.
+        # executemany этот LRU не использует (asyncpg готовит выражение сам), поэтому
+        # такие вызовы не считаем ни попаданием, ни промахом.
+        prepared = getattr(conn.connection.dbapi_connection, "_prepared_statement_cache", None)
+        if prepared is not None and not executemany:
+            if statement in prepared:
+                statement_cache_metrics.hits += 1
+            else:
+                statement_cache_metrics.misses += 1
+        context._query_stats_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - context._query_stats_started
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += duration
+
+        if duration * 1000 < settings.SLOW_QUERY_MS:
+            return
+        if stats is not None:
+            route_metrics.setdefault((stats.method, stats.route), RouteQueryMetrics()).slow_statements += 1
+        # Параметры не пишем: в них могут быть персональные данные и хэши паролей.
+        logger.warning(json.dumps({
+            "statement": statement,
+            "duration_ms": round(duration * 1000, 3),
+            "method": stats.method if stats is not None else None,
+            "route": stats.route if stats is not None else None,
+        }, ensure_ascii=False))
+
+
+def escape_label(value: str) -> str:
+    """Экранирует значение метки по формату Prometheus (обратный слэш, кавычки, перевод строки)."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(pool_stats: list[dict], job_stats: dict) -> str:
+    """
+    Формирует метрики SQL по маршрутам, метрики пула и фоновых задач в текстовом формате Prometheus.
+
+    Args:
+        pool_stats: состояние пулов из get_pool_stats() (метка engine у каждого).
+        job_stats: исходы фоновых задач (JobMetrics.as_dict()).
+
+    Returns:
+        Текст в формате Prometheus exposition 0.0.4.
+    """
+    lines = []
+
+    def family(name: str, kind: str, help_text: str):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def labels(method: str, route: str, **extra) -> str:
+        pairs = {"method": method, "route": route, **extra}
+        escaped = (f'{k}="{escape_label(str(v))}"' for k, v in pairs.items())
+        return "{" + ",".join(escaped) + "}"
+
+    counters = (
+        ("http_requests_total", "requests", "HTTP-запросы по маршрутам."),
+        ("db_statements_total", "statements", "SQL-выражения, выполненные при обработке запросов."),
+        ("db_duration_seconds_total", "db_seconds", "Суммарное время выполнения SQL."),
+        ("db_pool_wait_seconds_total", "pool_wait_seconds", "Суммарное ожидание соединения из пула."),
+        ("db_slow_statements_total", "slow_statements", "SQL-выражения дольше SLOW_QUERY_MS."),
+    )
+    for name, attr, help_text in counters:
+        family(name, "counter", help_text)
+        for (method, route), metrics in route_metrics.items():
+            lines.append(f"{name}{labels(method, route)} {getattr(metrics, attr)}")
+
+    family("db_statements_per_request", "histogram", "Число SQL-выражений на HTTP-запрос.")
+    for (method, route), metrics in route_metrics.items():
+        cumulative = 0
+        for bound, count in zip((*STATEMENTS_BUCKETS, "+Inf"), metrics.statements_buckets):
+            cumulative += count
+            lines.append(f"db_statements_per_request_bucket{labels(method, route, le=bound)} {cumulative}")
+        lines.append(f"db_statements_per_request_sum{labels(method, route)} {metrics.statements}")
+        lines.append(f"db_statements_per_request_count{labels(method, route)} {metrics.requests}")
+
+    family("db_statement_cache_hits_total", "counter", "Выполнения с подготовленным выражением из кэша asyncpg.")
+    lines.append(f"db_statement_cache_hits_total {statement_cache_metrics.hits}")
+    family("db_statement_cache_misses_total", "counter", "Выполнения, потребовавшие PREPARE.")
+    lines.append(f"db_statement_cache_misses_total {statement_cache_metrics.misses}")
+
+    # Пулы: текущие значения — gauge, накопленные — counter; серия на каждый движок.
+    for key in ("size", "checked_out", "checked_in", "overflow"):
+        family(f"db_pool_{key}", "gauge", f"Пул соединений: {key}.")
+        for stats in pool_stats:
+            lines.append(f'db_pool_{key}{{engine="{escape_label(stats["engine"])}"}} {stats[key]}')
+    for key in ("checkouts", "checkout_wait_seconds_total", "checkout_timeouts"):
+        name = f"db_pool_{key}" if key.endswith("_total") else f"db_pool_{key}_total"
+        family(name, "counter", f"Пул соединений: {key}.")
+        for stats in pool_stats:
+            lines.append(f'{name}{{engine="{escape_label(stats["engine"])}"}} {stats[key]}')
+
+    for key, value in job_stats.items():
+        family(f"jobs_{key}_total", "counter", f"Фоновые задачи: {key}.")
+        lines.append(f"jobs_{key}_total {value}")
+    return "\n".join(lines) + "\n"
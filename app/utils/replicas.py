@@ -0,0 +1,110 @@
+# app/utils/replicas.py
+
+import asyncio
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger("app.db.replicas")
+
+
+class ReplicaRouter:
+    """
+    Выбирает фабрику сессий для чтения: реплики по кругу, основная БД — запасной вариант.
+
+    Реплика, соединение с которой оборвалось во время запроса (или которая не ответила
+    фоновой проверке), исключается из ротации на retry_seconds; если недоступны все
+    реплики, чтение идет в основную БД. Сам выбор реплики не обращается к серверу.
+    """
+
+    def __init__(self, primary_session_maker, replicas: list, retry_seconds: float):
+        """
+        Args:
+            primary_session_maker: фабрика сессий основной БД.
+            replicas: список пар (движок, фабрика сессий) реплик.
+            retry_seconds: на сколько секунд исключать недоступную реплику.
+        """
+        self.primary_session_maker = primary_session_maker
+        self.engines = [engine for engine, _ in replicas]
+        self.session_makers = [session_maker for _, session_maker in replicas]
+        self.retry_seconds = retry_seconds
+        self.down_until = [0.0] * len(replicas)
+        self.next_index = 0
+        self.monitor_task: asyncio.Task | None = None
+        for index, engine in enumerate(self.engines):
+            self.watch(engine, index)
+
+    def mark_down(self, index: int, error: BaseException) -> None:
+        self.down_until[index] = time.monotonic() + self.retry_seconds
+        logger.warning("Реплика %s недоступна, чтение переключено на другие узлы: %s", index, error)
+
+    def watch(self, engine, index: int) -> None:
+        """Исключает реплику из ротации при обрыве соединения во время запроса."""
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def handle_error(context):
+            if context.is_disconnect:
+                self.mark_down(index, context.original_exception)
+
+    def next_available(self) -> int | None:
+        """Следующая по кругу доступная реплика или None, если доступных нет."""
+        now = time.monotonic()
+        for _ in range(len(self.session_makers)):
+            index = self.next_index
+            self.next_index = (self.next_index + 1) % len(self.session_makers)
+            if self.down_until[index] <= now:
+                return index
+        return None
+
+    def session_maker(self, prefer_primary: bool = False):
+        """
+        Возвращает фабрику сессий для очередного читающего запроса.
+
+        Соединение здесь не берется: сессия создается лениво (см. DBManager), и запрос,
+        ответ на который найден в кэше, не трогает ни пул, ни сервер.
+
+        Args:
+            prefer_primary: читать из основной БД (например, сразу после записи).
+
+        Returns:
+            Фабрика сессий реплики или основной БД.
+        """
+        if prefer_primary:
+            return self.primary_session_maker
+        index = self.next_available()
+        if index is None:
+            return self.primary_session_maker
+        return self.session_makers[index]
+
+    async def check(self, index: int) -> None:
+        """Проверяет реплику запросом SELECT 1 и исключает ее из ротации, если она не отвечает."""
+        try:
+            async with self.engines[index].connect() as conn:
+                await conn.exec_driver_sql("SELECT 1")
+        except (OSError, DBAPIError) as ex:
+            self.mark_down(index, ex)
+            return
+        if self.down_until[index] > time.monotonic():
+            logger.info("Реплика %s снова доступна", index)
+        self.down_until[index] = 0.0
+
+    async def monitor(self) -> None:
+        # Проверяем реплики чаще, чем истекает исключение из ротации: упавшая реплика
+        # не успевает вернуться в ротацию до следующей проверки.
+        while True:
+            await asyncio.gather(*(self.check(index) for index in range(len(self.engines))))
+            await asyncio.sleep(self.retry_seconds / 2)
+
+    def start(self) -> None:
+        """Запускает фоновую проверку реплик (вызывается при старте приложения)."""
+        if self.engines and self.monitor_task is None:
+            self.monitor_task = asyncio.create_task(self.monitor(), name="replica-monitor")
+
+    async def stop(self) -> None:
+        """Останавливает фоновую проверку реплик."""
+        if self.monitor_task is None:
+            return
+        self.monitor_task.cancel()
+        await asyncio.gather(self.monitor_task, return_exceptions=True)
+        self.monitor_task = None
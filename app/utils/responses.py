@@ -0,0 +1,27 @@
+# app/utils/responses.py
+
+from typing import Any
+
+from fastapi import Response
+
+from app.repositories.base import type_adapter
+
+
+class PydanticJSONResponse(Response):
+    """
+    JSON-ответ, который сериализует Pydantic-модели сразу в байты через TypeAdapter.dump_json.
+
+    Если эндпоинт возвращает обычные модели, FastAPI проверяет их по response_model еще раз,
+    переводит в dict (или прогоняет через jsonable_encoder) и только потом в JSON.
+    Модели из репозиториев уже проверены, поэтому здесь остается одна сериализация в Rust-ядре
+    pydantic. response_model у эндпоинта оставляем — он нужен для схемы OpenAPI.
+    """
+    media_type = "application/json"
+
+    def __init__(self, content: Any, tp: Any, **kwargs):
+        # render() вызывается из конструктора Response, поэтому тип нужно запомнить до него.
+        self.tp = tp
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return type_adapter(self.tp).dump_json(content)
@@ -0,0 +1,67 @@
+# app/utils/sql_log.py
+
+import json
+import logging
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger("app.sql")
+
+
+def setup_sql_logging(*engines) -> QueueListener | None:
+    """
+    Включает структурированный лог SQL-запросов на движках (если разрешено настройками).
+
+    Пишется уже скомпилированный текст запроса, который SQLAlchemy отправляет в драйвер,
+    поэтому повторной компиляции нет. Запись в поток вывода идет в отдельном потоке
+    (QueueHandler/QueueListener) и не блокирует event loop.
+
+    Args:
+        *engines: асинхронные движки SQLAlchemy (основная БД и реплики).
+
+    Returns:
+        Запущенный QueueListener или None, если лог выключен.
+    """
+    if not settings.SQL_LOG_ENABLED:
+        return None
+
+    # Event loop только кладет запись в очередь, а в stderr пишет фоновый поток.
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Сэмплирование: решаем заранее, чтобы для пропущенных запросов не тратить время вовсе.
+        if random.random() < settings.SQL_LOG_SAMPLE_RATE:
+            context._sql_log_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_sql_log_started", None)
+        if started is None:
+            return
+        record = {
+            "statement": statement,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "executemany": executemany,
+            # Узел БД (основная или реплика), на котором выполнен запрос.
+            "host": conn.engine.url.host,
+        }
+        # Параметры могут содержать персональные данные и хэши паролей — пишем только по явному разрешению.
+        if settings.SQL_LOG_PARAMETERS:
+            record["parameters"] = parameters
+        logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+    for engine in engines:
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    return listener